@@ -0,0 +1,39 @@
+import functools
+import os
+import pygame
+from pygame import Surface, Rect
+from game.utils import Dimension, ratio
+from typing import Tuple
+
+SPRITE_ASSET_CACHE_SIZE = 64
+PLAYER_SCALED_WIDTH = 75
+
+class SpriteAsset:
+    # decoded image plus its scaled copy, shared by every sprite that uses the same file at the same width
+    def __init__(self, image_file_path:str, image:Surface, scaled_width:int):
+        self.image_file_path = image_file_path
+        self.image = image
+        self.actual_dimension = Dimension.new(pair=self.image.get_size())
+        self.scaled_dimension = Dimension(width=scaled_width, height=ratio(val=scaled_width, mul=self.actual_dimension.height, div=self.actual_dimension.width))
+        self.scaled_image = pygame.transform.scale(self.image, self.scaled_dimension.get())
+        self.mask = None
+    def get_mask(self) -> pygame.mask.Mask:
+        # built on first use so rect-only games never pay for it
+        if self.mask is None:
+            self.mask = pygame.mask.from_surface(self.scaled_image)
+        return self.mask
+@functools.lru_cache(maxsize=SPRITE_ASSET_CACHE_SIZE)
+def load_cached_sprite_asset(image_file_path:str, scaled_width:int, is_converted:bool) -> SpriteAsset:
+    image = pygame.image.load(image_file_path)
+    image = image.convert_alpha() if is_converted else image
+    return SpriteAsset(image_file_path=image_file_path, image=image, scaled_width=scaled_width)
+def load_sprite_asset(image_file_path:str, scaled_width:int) -> SpriteAsset:
+    # surfaces converted for a display and plain ones loaded headless are cached apart
+    is_converted = pygame.display.get_surface() is not None
+    return load_cached_sprite_asset(image_file_path=os.path.abspath(image_file_path), scaled_width=scaled_width, is_converted=is_converted)
+def assets_overlap(asset:SpriteAsset, rect:Rect, other_asset:SpriteAsset, other_rect:Rect) -> bool:
+    # pixel narrowphase, only meaningful once the rects are known to collide
+    return asset.get_mask().overlap(other_asset.get_mask(), (other_rect.x - rect.x, other_rect.y - rect.y)) is not None
+def clear_sprite_assets():
+    load_cached_sprite_asset.cache_clear()
+    return
@@ -1,92 +1,488 @@
+import array
+import itertools
+import os
 import random
+import time
+import zlib
 import pygame
+from collections import Counter
 from enum import Enum
-from pygame import Surface
-from bs4 import BeautifulSoup, Tag
-from flask import Flask, jsonify, request, send_file, Response, render_template, make_response, url_for, session
-from PIL import Image
+from pygame import Surface, Rect
 from game.entities import Player, Team, Ball, InGamePlayer, InGameTeam, PlayerPosition, Strategy, LooseBall, SimpleAttack
-from game.court import Court, CourtArea
-from game.utils import ARC_PI, Color, Position, Dimension, Pixel, SpriteStyle, ratio, image_dimensions, find_trend
+from game.court import Court, CourtArea, SHOT_PLAYS
+from game.state import PlayerStateStore, ArrayLooseBall
+from game.projectiles import ProjectilePool
+from game.spatial import SpatialHash
+from game.navigation import NavigationGrid
+from game.possession import PossessionResolver
+from game.assets import load_sprite_asset
+from game.recording import MatchRecorder
+from game.profiling import TickProfiler
+from game.snapshot import MatchSnapshot
+from game.utils import ARC_PI, Color, Position, Dimension, Pixel, SpriteStyle, ratio, image_dimensions, convert, find_trend
 from pydantic import BaseModel
 from typing import List, Dict, Tuple, NamedTuple, TypeVar, Generic, Optional, Callable
 
+class MatchReplay(BaseModel):
+    # everything needed to re-simulate a match bit-exactly: the seed, the tick count and the ticks on which input restarted the game
+    home_team:str
+    away_team:str
+    seed:int
+    screen_size:Tuple[int, int]
+    ticks:int=0
+    restarts:List[int]=[]
+    checksum:int=0
+class ShotMix(BaseModel):
+    long:int=0
+    three:int=0
+    mid:int=0
+    post:int=0
+    drive:int=0
+    @classmethod
+    def new(cls, counts:List[int]) -> "ShotMix":
+        return cls(**dict(zip(SHOT_PLAYS, counts)))
+class MatchResult(BaseModel):
+    home_team:str
+    away_team:str
+    seed:int=0
+    ticks:int=0
+    home_possession_ticks:int=0
+    away_possession_ticks:int=0
+    loose_ball_ticks:int=0
+    flight_ticks:int=0
+    possession_changes:int=0
+    home_points:int=0
+    away_points:int=0
+    home_attempts:ShotMix=ShotMix()
+    home_makes:ShotMix=ShotMix()
+    away_attempts:ShotMix=ShotMix()
+    away_makes:ShotMix=ShotMix()
+class TeamBatchSummary(BaseModel):
+    matches:int=0
+    ticks:int=0
+    points:int=0
+    opponent_points:int=0
+    possession_ticks:int=0
+    opponent_possession_ticks:int=0
+    possession_changes:int=0
+class BatchResult(BaseModel):
+    matches:List[MatchResult]=[]
+    teams:Dict[str, TeamBatchSummary]={}
+    def add(self, match:MatchResult):
+        self.matches.append(match)
+        for team_name, points, opponent_points, possession_ticks, opponent_possession_ticks in [(match.home_team, match.home_points, match.away_points, match.home_possession_ticks, match.away_possession_ticks), (match.away_team, match.away_points, match.home_points, match.away_possession_ticks, match.home_possession_ticks)]:
+            summary = self.teams.setdefault(team_name, TeamBatchSummary())
+            summary.matches += 1
+            summary.ticks += match.ticks
+            summary.points += points
+            summary.opponent_points += opponent_points
+            summary.possession_ticks += possession_ticks
+            summary.opponent_possession_ticks += opponent_possession_ticks
+            summary.possession_changes += match.possession_changes
+        return
 class BasketBallTrialGame:
     SCREEN_WIDTH, SCREEN_HEIGHT = 1920, 1080
     SCREEN_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
     TICK_RATE = 60
-    def __init__(self, home_team:Team, away_team:Team):
-        pygame.init()
-        pygame.display.set_caption('Basketball Trial')
-        self.timer = pygame.time.Clock()
-        # self.window:Surface = pygame.display.set_mode(self.SCREEN_SIZE)
-        # self.window:Surface = pygame.display.set_mode((0, 0))
-        # You have to call this before pygame.display.set_mode()
-        info = pygame.display.Info()
-        screen_width, screen_height = info.current_w,info.current_h
-        self.window:Surface = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
+    SIMULATION_RATE = 60
+    MAX_TICKS_PER_FRAME = 5
+    STARTING_POSITION_ATTEMPTS = 20
+    def __init__(self, home_team:Team, away_team:Team, headless:bool=False, array_backend:bool=False, dirty_rects:bool=False, seed:int=None, profiler:TickProfiler=None, simulation_rate:int=SIMULATION_RATE, frame_rate:int=TICK_RATE, screen_size:Tuple[int, int]=None, pixel_collision:bool=False, navigation:bool=True):
+        self.pixel_collision = pixel_collision
+        self.simulation_rate = simulation_rate
+        self.frame_rate = frame_rate
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.headless = headless
+        self.array_backend = array_backend
+        if self.array_backend and self.pixel_collision:
+            raise ValueError("pixel_collision is not supported by the array backend, its moves are resolved rect against rect")
+        self.dirty_rects = dirty_rects
+        if self.headless:
+            # no display, no clock and no window until something renders the game, get_window then makes an off-screen one
+            self.timer = None
+            self.window:Optional[Surface] = None
+            self.screen_size = tuple(screen_size if screen_size is not None else self.SCREEN_SIZE)
+        else:
+            pygame.init()
+            pygame.display.set_caption('Basketball Trial')
+            self.timer = pygame.time.Clock()
+            # self.window:Surface = pygame.display.set_mode(self.SCREEN_SIZE)
+            # self.window:Surface = pygame.display.set_mode((0, 0))
+            # You have to call this before pygame.display.set_mode()
+            if screen_size is not None:
+                self.window:Surface = pygame.display.set_mode(screen_size)
+            else:
+                info = pygame.display.Info()
+                screen_width, screen_height = info.current_w,info.current_h
+                self.window:Surface = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
+            self.screen_size = self.window.get_size()
         self.game_running = True
-        self.court = Court(window=self.window)
+        self.court = Court(window=self.window, screen_size=self.screen_size, rng=self.rng)
         self.ball = Ball(window=self.window, court=self.court)
         self.home_team = InGameTeam(window=self.window, court=self.court, ball=self.ball, team=home_team, is_home=True)
         self.away_team = InGameTeam(window=self.window, court=self.court, ball=self.ball, team=away_team, is_home=False)
         self.all_teams = [self.home_team, self.away_team]
         self.all_players = [y for x in self.all_teams for y in x.players]
+        self.player_teams:Dict[InGamePlayer, InGameTeam] = {y:x for x in self.all_teams for y in x.players}
+        self.player_indexes:Dict[InGamePlayer, int] = {x:index for index, x in enumerate(self.all_players)}
         # self.all_sprites = [self.court, self.home_team, self.away_team]
         self.all_sprites = pygame.sprite.Group(self.court, self.home_team, self.away_team, self.ball)
-        self.strategy_loose_ball = LooseBall(court=self.court, ball=self.ball)
-        self.strategy_simple_attack = SimpleAttack(court=self.court, ball=self.ball)
-    def run_game(self):
+        self.spatial_hash = SpatialHash(court=self.court, cell_size=max([max(x.scaled_dimension.get()) for x in self.all_players], default=1))
+        self.possession = PossessionResolver(ball=self.ball, spatial_hash=self.spatial_hash, player_teams=self.player_teams, player_indexes=self.player_indexes, pixel_collision=self.pixel_collision)
+        self.player_state = None
+        # one navigation cell per player so a blocked cell means a body standing there
+        self.navigation = NavigationGrid(court=self.court, cell_size=self.spatial_hash.cell_size) if navigation else None
+        self.strategy_loose_ball = LooseBall(court=self.court, ball=self.ball, spatial_hash=self.spatial_hash, pixel_collision=self.pixel_collision, navigation=self.navigation)
+        if self.array_backend:
+            self.player_state = PlayerStateStore(teams=self.all_teams)
+            self.strategy_loose_ball = ArrayLooseBall(court=self.court, ball=self.ball, store=self.player_state, spatial_hash=self.spatial_hash, navigation=self.navigation)
+        # shots and passes fly as pooled projectiles
+        self.projectiles = ProjectilePool(bounds=Rect(self.court.rect))
+        self.strategy_simple_attack = SimpleAttack(court=self.court, ball=self.ball, spatial_hash=self.spatial_hash, pixel_collision=self.pixel_collision, navigation=self.navigation, projectiles=self.projectiles)
+        self.moving_sprites = [*self.all_players, self.ball]
+        self.background = None
+        self.background_layer = None
+        self.sprite_rects:Dict[pygame.sprite.Sprite, pygame.Rect] = {}
+        self.replay = self.new_replay()
+        self.recorder:MatchRecorder = None
+        self.spectators:"SpectatorServer" = None
+        self.display_update = pygame.display.update
+        self.profiler = profiler
+        self.profile_overlay = None
+        self.profile_overlay_rect = None
+        self.profile_overlay_frames = 0
+        if self.profiler is not None:
+            self.instrument(profiler=self.profiler)
+    def instrument(self, profiler:TickProfiler):
+        # swaps the hot methods for timed wrappers on this instance only, an uninstrumented game runs the plain methods
+        self.update_game_state = profiler.wrap(name="game_state", function=self.update_game_state)
+        self.update_player_in_possession = profiler.wrap(name="possession", function=self.update_player_in_possession)
+        self.strategy_loose_ball.execute = profiler.wrap(name="loose_ball", function=self.strategy_loose_ball.execute)
+        self.strategy_simple_attack.execute = profiler.wrap(name="simple_attack", function=self.strategy_simple_attack.execute)
+        self.strategy_simple_attack.fly = profiler.wrap(name="ball_flight", function=self.strategy_simple_attack.fly)
+        self.all_sprites.update = profiler.wrap(name="sprites", function=self.all_sprites.update)
+        self.draw_moving_sprites = profiler.wrap(name="sprites", function=self.draw_moving_sprites)
+        self.display_update = profiler.wrap(name="display", function=pygame.display.update)
+        return
+    def new_replay(self) -> MatchReplay:
+        return MatchReplay(home_team=self.home_team.team.name, away_team=self.away_team.team.name, seed=self.seed, screen_size=self.screen_size)
+    def get_window(self) -> Surface:
+        # headless games only pay for a screen sized surface once something renders them
+        if self.window is None:
+            self.set_window(window=Surface(self.screen_size))
+        return self.window
+    def set_window(self, window:Surface):
+        self.window = window
+        self.court.set_window(window=window)
+        for sprite in [self.ball, *self.all_teams, *self.all_players]:
+            sprite.window = window
+        return
+    def begin_match(self):
+        # every recorded match starts from the seed it records, whatever this game played before
+        self.rng.seed(self.seed)
+        self.replay = self.new_replay()
         self.start_game()
+        return
+    def run_game(self):
+        # fixed timestep: the simulation advances in steps of 1 / simulation_rate whatever the frame rate, rendering interpolates between the last two steps
+        if self.headless:
+            raise ValueError("a headless game has no display or clock to run on, use run_simulation instead")
+        self.begin_match()
+        self.snapshot_positions()
+        tick_seconds = 1 / self.simulation_rate
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+        pending_restarts = 0
         while self.game_running:
-            self.window.fill(Color.DARK_GREY)
-            is_update_game_state = True
             for event in pygame.event.get():
                 if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                     self.game_running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self.profiler is not None:
+                    self.toggle_profile_overlay()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     print(f"MOUSE BUTTON DOWN !!!")
-                    self.start_game()
-                    is_update_game_state = False
-            if is_update_game_state:
-                self.update_game_state()
-            # [x.update() for x in self.all_sprites]
-            self.all_sprites.update()
-            pygame.display.update()
-            self.timer.tick(self.TICK_RATE)
+                    pending_restarts += 1
+            current_time = time.perf_counter()
+            accumulator += current_time - previous_time
+            previous_time = current_time
+            ticks = 0
+            # under load several steps run before the next frame is drawn, so rendering skips frames instead of the game slowing down
+            while accumulator >= tick_seconds and ticks < self.MAX_TICKS_PER_FRAME:
+                self.snapshot_positions()
+                self.simulation_tick(restarts=pending_restarts)
+                if pending_restarts:
+                    self.snapshot_positions()
+                pending_restarts = 0
+                accumulator -= tick_seconds
+                ticks += 1
+            if accumulator >= tick_seconds:
+                # too far behind to catch up, drop the backlog rather than spiral
+                accumulator = accumulator % tick_seconds
+            self.render_frame(interpolation=accumulator / tick_seconds)
+            self.timer.tick(self.frame_rate)
+        self.replay.checksum = self.state_checksum()
+        self.stop_recording()
+        self.stop_spectating()
+        if self.profiler is not None:
+            print(self.profiler.report())
+        return
+    def render_frame(self, interpolation:float=1.0):
+        if self.dirty_rects:
+            self.render_dirty_frame(interpolation=interpolation)
+            return
+        self.draw_frame(interpolation=interpolation)
+        self.draw_profile_overlay()
+        self.display_update()
         return
+    def draw_frame(self, interpolation:float=1.0):
+        # the whole scene into the window surface, headless games call this directly to render off-screen
+        self.get_window().fill(Color.DARK_GREY)
+        # [x.update() for x in self.all_sprites]
+        self.all_sprites.update(interpolation)
+        return
+    def toggle_profile_overlay(self):
+        self.profile_overlay_frames = 0
+        self.profile_overlay = None if self.profile_overlay is not None else self.profiler.render_overlay()
+        if self.profile_overlay is None and self.background is not None and self.profile_overlay_rect is not None:
+            self.window.blit(self.background, self.profile_overlay_rect, self.profile_overlay_rect)
+            self.display_update(self.profile_overlay_rect)
+        return
+    def draw_profile_overlay(self) -> Optional[pygame.Rect]:
+        if self.profile_overlay is None: return None
+        # re-rendering the text twice a second is plenty and keeps the overlay out of its own timings
+        self.profile_overlay_frames += 1
+        if self.profile_overlay_frames % max(1, self.frame_rate // 2) == 0:
+            self.profile_overlay = self.profiler.render_overlay()
+        overlay_rect = self.window.blit(self.profile_overlay, (0, 0))
+        dirty_rect = overlay_rect if self.profile_overlay_rect is None else overlay_rect.union(self.profile_overlay_rect)
+        self.profile_overlay_rect = overlay_rect
+        return dirty_rect
+    def render_background(self):
+        self.background = convert(surface=Surface(self.window.get_size()))
+        self.background.fill(Color.DARK_GREY)
+        self.court.blit_markings_layer(surface=self.background)
+        self.background_layer = self.court.markings_layer
+        self.sprite_rects = {}
+        return
+    def render_dirty_frame(self, interpolation:float=1.0):
+        # restore the background under sprites that moved, redraw the sprites and push only the touched areas
+        is_full_update = self.background is None or self.background_layer is not self.court.get_markings_layer()
+        if is_full_update:
+            self.render_background()
+            self.window.blit(self.background, (0, 0))
+        dirty_rects = []
+        for sprite in self.moving_sprites:
+            rect = pygame.Rect(sprite.get_render_position(interpolation=interpolation), sprite.scaled_dimension.get())
+            previous_rect = self.sprite_rects.get(sprite)
+            # every sprite is restored and redrawn, blending an alpha sprite over itself would smear its edges
+            if previous_rect is not None:
+                self.window.blit(self.background, previous_rect, previous_rect)
+            if previous_rect == rect:
+                continue
+            if previous_rect is not None:
+                dirty_rects.append(previous_rect)
+            dirty_rects.append(rect)
+            self.sprite_rects[sprite] = rect
+        if self.profile_overlay is not None and self.profile_overlay_rect is not None:
+            self.window.blit(self.background, self.profile_overlay_rect, self.profile_overlay_rect)
+        self.draw_moving_sprites(interpolation=interpolation)
+        overlay_rect = self.draw_profile_overlay()
+        if overlay_rect is not None:
+            dirty_rects.append(overlay_rect)
+        if is_full_update:
+            self.display_update()
+        elif dirty_rects:
+            self.display_update(dirty_rects)
+        return
+    def draw_moving_sprites(self, interpolation:float=1.0):
+        [team.update(interpolation=interpolation) for team in self.all_teams]
+        self.ball.update(interpolation=interpolation)
+        return
+    def run_replay(self, replay:MatchReplay) -> bool:
+        # re-simulates a recorded match headless and reports whether it ended in the recorded state
+        # court geometry follows the window, so the replaying game must be built with the recorded screen_size
+        if self.screen_size != tuple(replay.screen_size):
+            raise ValueError(f"replay was recorded at {tuple(replay.screen_size)}, this game runs at {self.screen_size}")
+        self.seed = replay.seed
+        restarts = Counter(replay.restarts)
+        self.begin_match()
+        for tick in range(replay.ticks):
+            self.simulation_tick(restarts=restarts[tick])
+        self.replay.checksum = self.state_checksum()
+        return self.replay.checksum == replay.checksum
+    def run_simulation(self, ticks:int) -> MatchResult:
+        result = MatchResult(home_team=self.home_team.team.name, away_team=self.away_team.team.name, seed=self.seed, ticks=ticks)
+        [x.reset_stats() for x in self.all_teams]
+        self.begin_match()
+        player_in_possession = None
+        for _ in range(ticks):
+            self.update_game_state()
+            self.end_tick()
+            if self.ball.player_in_possession is not player_in_possession and self.ball.player_in_possession is not None:
+                result.possession_changes += 1
+            player_in_possession = self.ball.player_in_possession
+            team_in_possession = self.player_teams.get(player_in_possession)
+            if self.ball.is_in_flight():
+                result.flight_ticks += 1
+            elif team_in_possession is None:
+                result.loose_ball_ticks += 1
+            elif team_in_possession is self.home_team:
+                result.home_possession_ticks += 1
+            else:
+                result.away_possession_ticks += 1
+        result.home_points, result.away_points = self.home_team.points, self.away_team.points
+        result.home_attempts, result.home_makes = ShotMix.new(counts=self.home_team.attempts), ShotMix.new(counts=self.home_team.makes)
+        result.away_attempts, result.away_makes = ShotMix.new(counts=self.away_team.attempts), ShotMix.new(counts=self.away_team.makes)
+        self.replay.checksum = self.state_checksum()
+        return result
     def start_game(self):
+        self.projectiles.clear()
         self.ball.starting_position()
         self.players_to_starting_positions()
         return
+    def restart_game(self):
+        self.replay.restarts.append(self.replay.ticks)
+        self.start_game()
+        return
+    def simulation_tick(self, restarts:int=0):
+        # a tick on which input restarted the game does not also advance it, replays rely on this
+        [self.restart_game() for _ in range(restarts)]
+        if restarts == 0:
+            self.update_game_state()
+        self.end_tick()
+        return
+    def capture_state(self) -> MatchSnapshot:
+        # cheap enough to take once per tick and restore hundreds of times for look-ahead rollouts
+        player_index = self.player_indexes.get(self.ball.player_in_possession, -1)
+        team_stats = tuple([(x.points, x.attempts[:], x.makes[:]) for x in self.all_teams])
+        flight = (self.ball.flight_slot, self.projectiles.get_state())
+        if self.player_state is not None:
+            return MatchSnapshot(ball_position=self.ball.position.get(), player_index=player_index, x=self.player_state.x.copy(), y=self.player_state.y.copy(), stamina=self.player_state.stamina.copy(), rng_state=self.rng.getstate(), team_stats=team_stats, flight=flight)
+        x = MatchSnapshot.columns(values=[player.position.x for player in self.all_players])
+        y = MatchSnapshot.columns(values=[player.position.y for player in self.all_players])
+        stamina = MatchSnapshot.columns(values=[player.stamina for player in self.all_players])
+        return MatchSnapshot(ball_position=self.ball.position.get(), player_index=player_index, x=x, y=y, stamina=stamina, rng_state=self.rng.getstate(), team_stats=team_stats, flight=flight)
+    def restore_state(self, snapshot:MatchSnapshot):
+        if self.player_state is not None:
+            self.player_state.x[:] = snapshot.x
+            self.player_state.y[:] = snapshot.y
+            self.player_state.stamina[:] = snapshot.stamina
+        else:
+            for player, x, y in zip(self.all_players, snapshot.x, snapshot.y):
+                player.position.set(x=x, y=y)
+        for player, stamina in zip(self.all_players, snapshot.stamina):
+            player.stamina = stamina
+        for team, (points, attempts, makes) in zip(self.all_teams, snapshot.team_stats):
+            team.points = points
+            team.attempts[:] = attempts
+            team.makes[:] = makes
+        self.ball.flight_slot, projectiles = snapshot.flight
+        self.projectiles.set_state(state=projectiles)
+        self.ball.position.set(*snapshot.ball_position)
+        if snapshot.player_index < 0:
+            self.ball.unset_possession()
+        else:
+            player = self.all_players[snapshot.player_index]
+            self.ball.set_possession(player=player, team=self.player_teams[player])
+        self.possession.holder = self.ball.player_in_possession
+        self.rng.setstate(snapshot.rng_state)
+        self.spatial_hash.update_all(sprites=self.all_players)
+        return
+    def rollout(self, snapshot:MatchSnapshot, ticks:int) -> MatchSnapshot:
+        # plays ticks forward from snapshot without touching the replay or the recording, the caller restores afterwards
+        self.restore_state(snapshot=snapshot)
+        for _ in range(ticks):
+            self.update_game_state()
+        return self.capture_state()
+    def snapshot_positions(self):
+        for sprite in self.moving_sprites:
+            sprite.previous_position = sprite.position.get()
+        return
+    def end_tick(self):
+        self.replay.ticks += 1
+        if self.recorder is not None:
+            self.record_tick()
+        # nothing is gathered for the feed while nobody is watching
+        if self.spectators is not None and self.spectators.has_subscribers():
+            self.publish_tick()
+        return
+    def start_recording(self, file_path:str):
+        self.stop_recording()
+        self.recorder = MatchRecorder(file_path=file_path, player_count=len(self.all_players), seed=self.seed)
+        return
+    def stop_recording(self):
+        if self.recorder is not None:
+            # a failed recording is dropped before its error is raised, the game does not keep writing into it
+            recorder, self.recorder = self.recorder, None
+            recorder.close()
+        return
+    def start_spectating(self, host:str="127.0.0.1", port:int=0) -> int:
+        # returns the port the feed listens on, port 0 lets the system pick a free one
+        self.stop_spectating()
+        # asyncio is only paid for by games that are watched
+        from game.spectator import SpectatorServer
+        self.spectators = SpectatorServer(player_count=len(self.all_players), host=host, port=port)
+        return self.spectators.port
+    def stop_spectating(self):
+        if self.spectators is not None:
+            self.spectators.close()
+            self.spectators = None
+        return
+    def get_tick_values(self) -> Tuple[int, int, List[int]]:
+        # player in possession, team in possession and the flat x, y of every player, as recordings and the spectator feed store them
+        player_index = self.player_indexes.get(self.ball.player_in_possession, -1)
+        team_in_possession = self.player_teams.get(self.ball.player_in_possession)
+        team_index = -1 if team_in_possession is None else self.all_teams.index(team_in_possession)
+        player_positions = [y for x in self.all_players for y in x.position.get()]
+        return player_index, team_index, player_positions
+    def record_tick(self):
+        player_index, team_index, player_positions = self.get_tick_values()
+        self.recorder.record(tick=self.replay.ticks, ball_position=self.ball.position.get(), player_index=player_index, team_index=team_index, player_positions=player_positions)
+        return
+    def publish_tick(self):
+        player_index, team_index, player_positions = self.get_tick_values()
+        self.spectators.publish(tick=self.replay.ticks, ball_position=self.ball.position.get(), player_index=player_index, team_index=team_index, player_positions=player_positions)
+        return
+    def state_checksum(self) -> int:
+        player_index = self.player_indexes.get(self.ball.player_in_possession, -1)
+        values = [*self.ball.position.get(), player_index, *[y for x in self.all_players for y in x.position.get()]]
+        return zlib.crc32(array.array('q', values).tobytes())
     def players_to_starting_positions(self):
         # player.position = self.defense_area.starting_position(player_width=player.scaled_dimension.width, player_height=player.scaled_dimension.height) if player.position is None else player.position
-        [self.players_to_starting_positions_within_area(player=player, area=self.home_team.defense_area) for player in self.home_team.players]
-        [self.players_to_starting_positions_within_area(player=player, area=self.away_team.defense_area) for player in self.away_team.players]
+        placed_players:List[InGamePlayer] = []
+        for team in self.all_teams:
+            for player in team.players:
+                self.players_to_starting_positions_within_area(player=player, area=team.defense_area, placed_players=placed_players)
+                placed_players.append(player)
+        self.spatial_hash.update_all(sprites=self.all_players)
         return
     @classmethod
-    def players_to_starting_positions_within_area(cls, player:InGamePlayer, area:CourtArea):
+    def players_to_starting_positions_within_area(cls, player:InGamePlayer, area:CourtArea, placed_players:List[InGamePlayer]=()):
         # player.position = area.random_position(player_width=player.scaled_dimension.width, player_height=player.scaled_dimension.height) if player.position is None else player.position
-        player.position = area.random_position(player_width=player.scaled_dimension.width, player_height=player.scaled_dimension.height)
+        # players that start on top of each other can never move apart, so overlapping spots are redrawn a few times
+        for _ in range(cls.STARTING_POSITION_ATTEMPTS):
+            position = area.random_position(player_width=player.scaled_dimension.width, player_height=player.scaled_dimension.height)
+            if Strategy.is_player_not_colliding(player=player, all_players=placed_players, x=position.x, y=position.y):
+                break
+        player.position = position
         # print(f"[RESET][{player.player.name}] {player.position.get()}")
         return
     def update_player_in_possession(self):
-        has_possession = False
-        for team in self.all_teams:
-            for player in self.all_players:
-                if player.position is None: continue
-                has_possession = pygame.Rect.colliderect(player.get_rect(), self.ball.get_rect())
-                # print(f"COLLISION={has_possession} | p={player.player.name} {player.get_rect()} | b={self.ball.get_rect()}")
-                if has_possession:
-                    self.ball.set_possession(player=player, team=team)
-                    break
-            if has_possession:
-                break
-        if not has_possession:
-            self.ball.unset_possession()
-        self.ball.sync_ball_position_to_possession()
+        self.possession.resolve()
         return
     def update_game_state(self):
+        if self.navigation is not None:
+            self.navigation.refresh(players=self.all_players)
+        if self.ball.is_in_flight():
+            # nobody can take a ball in the air, everyone moves to where it is going to come down
+            self.strategy_simple_attack.fly(teams=self.all_teams)
+            if self.ball.is_in_flight():
+                x, y = self.projectiles.get_target(slot=self.ball.flight_slot)
+                self.strategy_loose_ball.execute(teams=self.all_teams, x=x, y=y)
+            else:
+                self.strategy_loose_ball.execute(teams=self.all_teams)
+            return
         self.update_player_in_possession()
         player_in_possession_name = None if self.ball.player_in_possession is None else self.ball.player_in_possession.player.name
         if self.ball.is_not_in_possession():
@@ -96,6 +492,28 @@ class BasketBallTrialGame:
             # print(f"No Strategy | Possession={player_in_possession_name} | {self.ball.player_in_possession}")
             self.strategy_simple_attack.execute(teams=self.all_teams)
         return
+def init_batch_worker(image_file_paths:List[str]):
+    # decode and scale every sprite once per worker so no match pays for it
+    [load_sprite_asset(image_file_path=image_file_path, scaled_width=InGamePlayer.SCALED_WIDTH) for image_file_path in image_file_paths]
+    load_sprite_asset(image_file_path=Ball.IMAGE_FILE_PATH, scaled_width=Ball.SCALED_WIDTH)
+    return
+def simulate_match(home_team:Team, away_team:Team, ticks:int, seed:int=None) -> MatchResult:
+    basketball_trial = BasketBallTrialGame(home_team=home_team, away_team=away_team, headless=True, seed=seed)
+    return basketball_trial.run_simulation(ticks=ticks)
+def run_batch(pairings:List[Tuple[Team, Team]], ticks:int, max_workers:int=None, seed:int=None) -> BatchResult:
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    # every match gets its own seed drawn from the batch seed, MatchResult.seed replays any single one of them
+    batch_rng = random.Random(seed)
+    seeds = [batch_rng.randrange(2 ** 32) for _ in pairings]
+    image_file_paths = sorted({player.image_file_path for pairing in pairings for team in pairing for player in team.players})
+    # a few chunks per worker keeps the pool busy without pickling every match separately
+    chunksize = max(1, len(pairings) // (workers * 4))
+    batch_result = BatchResult()
+    # multiprocessing is only paid for by batch runs
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(image_file_paths,)) as executor:
+        [batch_result.add(match=match) for match in executor.map(simulate_match, [x[0] for x in pairings], [x[1] for x in pairings], itertools.repeat(ticks), seeds, chunksize=chunksize)]
+    return batch_result
 def execute():
     # basketball_trial = BasketBallTrialGame()
     # basketball_trial.run_game()
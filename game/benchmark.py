@@ -0,0 +1,233 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+# must be set before pygame is imported: no banner on stdout and no real window
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from game.basketball_trial import BasketBallTrialGame
+from game.entities import Player, Team, PlayerPosition, Strategy
+from game.profiling import TickProfiler
+from typing import List, Dict, Callable
+
+BENCHMARK_IMAGE_FILE_PATH = "../game/images/basketball.png"
+BENCHMARK_SEED = 1234
+BENCHMARK_SCREEN_SIZE = (1920, 1080)
+BENCHMARK_PLAYER_COUNTS = [5, 25, 50]
+# ticks between restarts, long enough for possession to settle and short enough that loose ball play keeps recurring
+BENCHMARK_ROUND_TICKS = 120
+# cold import of game.basketball_trial including pygame and pydantic, and the share spent in the game modules themselves
+STARTUP_BUDGET_MS = 500
+STARTUP_GAME_MODULES_BUDGET_MS = 60
+STARTUP_MODULE = "game.basketball_trial"
+
+def make_team(name:str, player_count:int, rng:random.Random, image_file_path:str=BENCHMARK_IMAGE_FILE_PATH) -> Team:
+    positions = list(PlayerPosition)
+    return Team(name=name, players=[Player(name=f"{name}-{index}", image_file_path=image_file_path, position=positions[index % len(positions)], speed=rng.randint(1, 3)) for index in range(player_count)])
+def make_game(player_count:int, seed:int=BENCHMARK_SEED, headless:bool=True, **kwargs) -> BasketBallTrialGame:
+    rng = random.Random(seed)
+    home_team = make_team(name="home", player_count=player_count, rng=rng)
+    away_team = make_team(name="away", player_count=player_count, rng=rng)
+    basketball_trial = BasketBallTrialGame(home_team=home_team, away_team=away_team, headless=headless, seed=seed, screen_size=BENCHMARK_SCREEN_SIZE, **kwargs)
+    basketball_trial.begin_match()
+    basketball_trial.snapshot_positions()
+    return basketball_trial
+def calls_per_second(function:Callable, number:int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return number / (time.perf_counter() - start)
+def rounds_per_second(restart:Callable, function:Callable, rounds:int, calls:int=BENCHMARK_ROUND_TICKS) -> float:
+    # restarts happen outside the timed part so every round measures the same mix of play
+    elapsed = 0.0
+    for _ in range(rounds):
+        restart()
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        elapsed += time.perf_counter() - start
+    return (rounds * calls) / elapsed
+def phase_timings(profiler:TickProfiler) -> Dict[str, Dict[str, float]]:
+    return {x.name: {"count": x.count, "mean_ms": x.mean_ms, "p50_ms": x.p50_ms, "p95_ms": x.p95_ms, "p99_ms": x.p99_ms} for x in profiler.summaries() if x.count}
+def benchmark_loose_ball(player_count:int, array_backend:bool=False, rounds:int=10) -> Dict:
+    basketball_trial = make_game(player_count=player_count, array_backend=array_backend)
+    execute = lambda: basketball_trial.strategy_loose_ball.execute(teams=basketball_trial.all_teams)
+    return {"name": "loose_ball_execute", "players": len(basketball_trial.all_players), "array_backend": array_backend, "calls_per_second": rounds_per_second(restart=basketball_trial.start_game, function=execute, rounds=rounds)}
+def benchmark_possession(player_count:int, number:int=5000) -> Dict:
+    basketball_trial = make_game(player_count=player_count)
+    return {"name": "update_player_in_possession", "players": len(basketball_trial.all_players), "calls_per_second": calls_per_second(function=basketball_trial.update_player_in_possession, number=number)}
+def benchmark_court_update(number:int=500) -> Dict:
+    basketball_trial = make_game(player_count=5, headless=False)
+    court = basketball_trial.court
+    return {"name": "court_update", "cached_calls_per_second": calls_per_second(function=court.update, number=number), "uncached_calls_per_second": calls_per_second(function=court.draw_markings, number=number)}
+def benchmark_sprite_blit(player_count:int, number:int=500) -> Dict:
+    basketball_trial = make_game(player_count=player_count, headless=False)
+    return {"name": "sprite_blit", "players": len(basketball_trial.all_players), "calls_per_second": calls_per_second(function=basketball_trial.draw_moving_sprites, number=number)}
+def benchmark_frames(player_count:int, dirty_rects:bool=False, rounds:int=5) -> Dict:
+    # one run_game frame without the event pump and the frame cap: a simulation tick followed by a render
+    profiler = TickProfiler()
+    basketball_trial = make_game(player_count=player_count, headless=False, dirty_rects=dirty_rects, profiler=profiler)
+    def frame():
+        basketball_trial.snapshot_positions()
+        basketball_trial.simulation_tick()
+        basketball_trial.render_frame()
+        return
+    ticks_per_second = rounds_per_second(restart=basketball_trial.start_game, function=frame, rounds=rounds)
+    return {"name": "run_game_frame", "players": len(basketball_trial.all_players), "dirty_rects": dirty_rects, "ticks_per_second": ticks_per_second, "phases": phase_timings(profiler=profiler)}
+def benchmark_simulation(player_count:int, ticks:int=2000) -> Dict:
+    profiler = TickProfiler()
+    basketball_trial = make_game(player_count=player_count, profiler=profiler)
+    start = time.perf_counter()
+    basketball_trial.run_simulation(ticks=ticks)
+    return {"name": "headless_simulation", "players": len(basketball_trial.all_players), "ticks_per_second": ticks / (time.perf_counter() - start), "phases": phase_timings(profiler=profiler)}
+def benchmark_collision(player_count:int, number:int=2000) -> Dict:
+    # same rect broadphase for both paths, the pixel path adds the cached mask narrowphase on rect hits
+    basketball_trial = make_game(player_count=player_count)
+    players = basketball_trial.all_players
+    rng = random.Random(BENCHMARK_SEED)
+    # crowd everyone around the ball so a good share of the rect tests hit
+    for player in players:
+        player.position.set(x=basketball_trial.ball.position.x + rng.randint(-150, 150), y=basketball_trial.ball.position.y + rng.randint(-150, 150))
+    def colliding(pixel_collision:bool):
+        return [Strategy.is_player_colliding(player=player, all_players=players, pixel_collision=pixel_collision) for player in players]
+    return {
+        "name": "collision_sweep",
+        "players": len(players),
+        "rect_hits": sum(colliding(pixel_collision=False)),
+        "pixel_hits": sum(colliding(pixel_collision=True)),
+        "rect_sweeps_per_second": calls_per_second(function=lambda: colliding(pixel_collision=False), number=number),
+        "pixel_sweeps_per_second": calls_per_second(function=lambda: colliding(pixel_collision=True), number=number),
+    }
+def benchmark_decisions(player_count:int, number:int=2000) -> Dict:
+    # scoring every shot and pass for the holder, the batched step SimpleAttack takes whenever the holder reconsiders
+    basketball_trial = make_game(player_count=player_count)
+    attacking_team, defending_team = basketball_trial.all_teams
+    decisions = basketball_trial.strategy_simple_attack.decisions
+    rng = random.Random(BENCHMARK_SEED)
+    decide = lambda: decisions.decide(attackers=attacking_team.players, attack_ratings=attacking_team.ratings, defenders=defending_team.players, defense_ratings=defending_team.ratings, holder=0, basket=attacking_team.attack_basket, rng=rng)
+    return {"name": "attack_decision", "players": len(basketball_trial.all_players), "calls_per_second": calls_per_second(function=decide, number=number)}
+def benchmark_projectiles(projectile_count:int=1000, number:int=200) -> Dict:
+    # a drill's worth of balls in the air at once, every step moves all of them and recycles the ones that land
+    from game.projectiles import ProjectilePool
+    width, height = BENCHMARK_SCREEN_SIZE
+    pool = ProjectilePool(bounds=pygame.Rect(0, 0, width, height), capacity=projectile_count)
+    rng = random.Random(BENCHMARK_SEED)
+    def step():
+        [pool.spawn(x=width // 2, y=height // 2, target_x=rng.randrange(width), target_y=rng.randrange(height), speed=rng.randint(4, 16)) for _ in range(len(pool.free_slots))]
+        pool.step()
+        return
+    return {"name": "projectile_step", "projectiles": projectile_count, "steps_per_second": calls_per_second(function=step, number=number)}
+def benchmark_navigation(player_count:int, number:int=500) -> Dict:
+    # a cold distance field after the layout changed, and a waypoint for every player off a warm one
+    basketball_trial = make_game(player_count=player_count)
+    navigation = basketball_trial.navigation
+    navigation.refresh(players=basketball_trial.all_players)
+    target = navigation.cell(x=basketball_trial.ball.position.x, y=basketball_trial.ball.position.y)
+    def rebuild():
+        navigation.clear()
+        navigation.distance_field(target=target)
+        return
+    waypoints = lambda: [navigation.next_waypoint(player=player, x=basketball_trial.ball.position.x, y=basketball_trial.ball.position.y) for player in basketball_trial.all_players]
+    return {"name": "navigation", "players": len(basketball_trial.all_players), "field_builds_per_second": calls_per_second(function=rebuild, number=number), "waypoint_sweeps_per_second": calls_per_second(function=waypoints, number=number)}
+def benchmark_rollouts(player_count:int, array_backend:bool=False, ticks:int=10, number:int=200) -> Dict:
+    # look-ahead cost: restore a shared snapshot and play a few ticks forward, as a strategy trying candidate moves would
+    basketball_trial = make_game(player_count=player_count, array_backend=array_backend)
+    snapshot = basketball_trial.capture_state()
+    return {
+        "name": "rollout",
+        "players": len(basketball_trial.all_players),
+        "array_backend": array_backend,
+        "ticks": ticks,
+        "captures_per_second": calls_per_second(function=basketball_trial.capture_state, number=number),
+        "restores_per_second": calls_per_second(function=lambda: basketball_trial.restore_state(snapshot=snapshot), number=number),
+        "rollouts_per_second": calls_per_second(function=lambda: basketball_trial.rollout(snapshot=snapshot, ticks=ticks), number=number),
+    }
+def run_benchmarks(player_counts:List[int]=BENCHMARK_PLAYER_COUNTS) -> Dict:
+    benchmarks = []
+    for player_count in player_counts:
+        benchmarks.append(benchmark_loose_ball(player_count=player_count))
+        benchmarks.append(benchmark_loose_ball(player_count=player_count, array_backend=True))
+        benchmarks.append(benchmark_possession(player_count=player_count))
+        benchmarks.append(benchmark_sprite_blit(player_count=player_count))
+        benchmarks.append(benchmark_frames(player_count=player_count))
+        benchmarks.append(benchmark_frames(player_count=player_count, dirty_rects=True))
+        benchmarks.append(benchmark_simulation(player_count=player_count))
+        benchmarks.append(benchmark_collision(player_count=player_count))
+        benchmarks.append(benchmark_decisions(player_count=player_count))
+        benchmarks.append(benchmark_navigation(player_count=player_count))
+        benchmarks.append(benchmark_rollouts(player_count=player_count))
+        benchmarks.append(benchmark_rollouts(player_count=player_count, array_backend=True))
+    benchmarks.append(benchmark_court_update())
+    benchmarks.append(benchmark_projectiles())
+    environment = {"python": platform.python_version(), "pygame": pygame.version.ver, "sdl": ".".join(map(str, pygame.get_sdl_version())), "video_driver": os.environ["SDL_VIDEODRIVER"], "seed": BENCHMARK_SEED, "screen_size": BENCHMARK_SCREEN_SIZE}
+    return {"environment": environment, "benchmarks": benchmarks}
+def measure_startup(module:str=STARTUP_MODULE) -> Dict[str, float]:
+    # -X importtime writes "import time: self [us] | cumulative | imported package" for every module to stderr
+    environment = {**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"}
+    repository_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=repository_path, env=environment, capture_output=True, text=True, check=True)
+    total_us, game_modules_us = 0, 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit(): continue
+        if name.strip() == module:
+            total_us = int(cumulative_us)
+        if name.strip() == "game" or name.strip().startswith("game."):
+            game_modules_us += int(self_us)
+    return {"total_ms": total_us / 1000, "game_modules_ms": game_modules_us / 1000}
+def benchmark_startup(runs:int=5) -> Dict[str, float]:
+    # the fastest of a few cold starts, the others mostly measure disk cache and scheduler noise
+    measurements = [measure_startup() for _ in range(runs)]
+    return {
+        "total_ms": min([x["total_ms"] for x in measurements]),
+        "game_modules_ms": min([x["game_modules_ms"] for x in measurements]),
+        "budget_ms": STARTUP_BUDGET_MS,
+        "game_modules_budget_ms": STARTUP_GAME_MODULES_BUDGET_MS,
+    }
+def check_startup_budget() -> bool:
+    startup = benchmark_startup()
+    print(json.dumps({"startup": startup}, indent=2))
+    within_budget = startup["total_ms"] <= startup["budget_ms"] and startup["game_modules_ms"] <= startup["game_modules_budget_ms"]
+    if not within_budget:
+        print(f"import of {STARTUP_MODULE} is over budget", file=sys.stderr)
+    return within_budget
+def check_replays(player_count:int=5, ticks:int=3000, runs:int=3) -> bool:
+    # every run of one game, not just the first, has to leave a replay that a fresh game reproduces
+    basketball_trial = make_game(player_count=player_count)
+    results = []
+    for run in range(runs):
+        basketball_trial.run_simulation(ticks=ticks)
+        replaying = make_game(player_count=player_count)
+        results.append(replaying.run_replay(replay=basketball_trial.replay))
+    print(json.dumps({"replays": results}))
+    if not all(results):
+        print(f"replays of runs {[x for x, replayed in enumerate(results) if not replayed]} did not reproduce", file=sys.stderr)
+    return all(results)
+def execute(output_file_path:str=None):
+    results = json.dumps(run_benchmarks(), indent=2)
+    if output_file_path is None:
+        print(results)
+    else:
+        with open(output_file_path, "w") as output_file:
+            output_file.write(results)
+    return
+def main():
+    # python -m game.benchmark [results.json] runs the suite, python -m game.benchmark startup checks the import budget
+    # and python -m game.benchmark replay checks that repeated runs of one game replay exactly
+    arguments = sys.argv[1:]
+    if arguments == ["startup"]:
+        sys.exit(0 if check_startup_budget() else 1)
+    output_file_path = os.path.abspath(arguments[0]) if arguments and arguments != ["replay"] else None
+    # sprite paths are relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if arguments == ["replay"]:
+        sys.exit(0 if check_replays() else 1)
+    execute(output_file_path=output_file_path)
+    return
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import math
+import pygame
+from pygame import Surface, Rect
+from game.assets import SpriteAsset
+from game.basketball_trial import BasketBallTrialGame
+from game.court import Court
+from game.snapshot import MatchSnapshot
+from game.utils import Color, convert
+from typing import List, Dict, Tuple, Optional
+
+BROADCAST_TILE_SIZE = (160, 240)
+
+class BroadcastTile:
+    # one match on the wall: where its thumbnail sits, how its court maps into it and the images it draws with
+    def __init__(self, game:BasketBallTrialGame, rect:Rect, scale:float, background:Surface, images:List[Surface]):
+        self.game = game
+        self.rect = rect
+        self.scale = scale
+        self.background = background
+        # player images in all_players order followed by the ball, the order snapshots store positions in
+        self.images = images
+        self.state_key = None
+    def get_position(self, x:int, y:int) -> Tuple[int, int]:
+        court = self.game.court
+        return self.rect.x + int((x - court.left) * self.scale), self.rect.y + int((y - court.top) * self.scale)
+class BroadcastWall:
+    # many headless matches as thumbnails in one atlas surface, scaled courts and sprites are shared between tiles
+    def __init__(self, games:List[BasketBallTrialGame], columns:int, tile_size:Tuple[int, int]=BROADCAST_TILE_SIZE, surface:Surface=None):
+        self.games = games
+        self.columns = max(1, columns)
+        self.rows = max(1, math.ceil(len(games) / self.columns))
+        self.tile_size = tile_size
+        self.atlas = surface if surface is not None else Surface((self.columns * tile_size[0], self.rows * tile_size[1]))
+        self.atlas.fill(Color.DARK_GREY)
+        self.backgrounds:Dict[Tuple, Surface] = {}
+        self.images:Dict[Tuple, Surface] = {}
+        self.tiles = [self.new_tile(game=game, index=index) for index, game in enumerate(games)]
+    def new_tile(self, game:BasketBallTrialGame, index:int) -> BroadcastTile:
+        tile_width, tile_height = self.tile_size
+        row, column = divmod(index, self.columns)
+        court = game.court
+        scale = min(tile_width / court.width, tile_height / court.height)
+        images = [self.scaled_image(asset=x.asset, scale=scale) for x in [*game.all_players, game.ball]]
+        return BroadcastTile(game=game, rect=Rect(column * tile_width, row * tile_height, tile_width, tile_height), scale=scale, background=self.court_background(court=court, scale=scale), images=images)
+    def court_background(self, court:Court, scale:float) -> Surface:
+        # every court of one screen size looks the same, it is drawn and scaled once for the whole wall
+        key = (court.get_window_size(), scale)
+        if key not in self.backgrounds:
+            background = Surface(court.dimension.get())
+            background.fill(Color.DARK_GREY)
+            layer = court.get_markings_layer()
+            layer_x, layer_y = court.markings_layer_position.get()
+            background.blit(layer, (layer_x - court.left, layer_y - court.top))
+            size = (max(1, int(court.width * scale)), max(1, int(court.height * scale)))
+            self.backgrounds[key] = convert(surface=pygame.transform.smoothscale(background, size))
+        return self.backgrounds[key]
+    def scaled_image(self, asset:SpriteAsset, scale:float) -> Surface:
+        key = (asset.image_file_path, asset.scaled_dimension.get(), scale)
+        if key not in self.images:
+            width, height = asset.scaled_dimension.get()
+            image = pygame.transform.smoothscale(asset.scaled_image, (max(1, round(width * scale)), max(1, round(height * scale))))
+            self.images[key] = image.convert_alpha() if pygame.display.get_surface() is not None else image
+        return self.images[key]
+    @classmethod
+    def get_positions(cls, game:BasketBallTrialGame) -> List[Tuple[int, int]]:
+        # only what a tile draws, read straight off the sprites
+        return [*[x.position.get() for x in game.all_players], game.ball.position.get()]
+    @classmethod
+    def get_snapshot_positions(cls, snapshot:MatchSnapshot) -> List[Tuple[int, int]]:
+        return [*[(int(x), int(y)) for x, y in zip(snapshot.x, snapshot.y)], snapshot.ball_position]
+    def draw_tile(self, tile:BroadcastTile, positions:List[Tuple[int, int]]):
+        self.atlas.set_clip(tile.rect)
+        self.atlas.blit(tile.background, tile.rect.topleft)
+        self.atlas.blits([(image, tile.get_position(x=x, y=y)) for image, (x, y) in zip(tile.images, positions)], doreturn=False)
+        self.atlas.set_clip(None)
+        return
+    def draw(self, snapshots:List[MatchSnapshot]=None) -> List[Rect]:
+        # redraws only the tiles whose match moved since the last draw and returns their rects for display.update
+        all_positions = [self.get_snapshot_positions(snapshot=x) for x in snapshots] if snapshots is not None else [self.get_positions(game=x) for x in self.games]
+        dirty_rects = []
+        for tile, positions in zip(self.tiles, all_positions):
+            state_key = tuple(positions)
+            if state_key == tile.state_key:
+                continue
+            tile.state_key = state_key
+            self.draw_tile(tile=tile, positions=positions)
+            dirty_rects.append(tile.rect)
+        return dirty_rects
+def run_broadcast(games:List[BasketBallTrialGame], columns:int, tile_size:Tuple[int, int]=BROADCAST_TILE_SIZE, frame_rate:int=BasketBallTrialGame.TICK_RATE):
+    # one window for every match, each frame advances all of them by a tick and pushes only the tiles that changed
+    pygame.init()
+    pygame.display.set_caption('Basketball Trial Wall')
+    rows = max(1, math.ceil(len(games) / max(1, columns)))
+    window = pygame.display.set_mode((max(1, columns) * tile_size[0], rows * tile_size[1]))
+    wall = BroadcastWall(games=games, columns=columns, tile_size=tile_size, surface=window)
+    timer = pygame.time.Clock()
+    [x.begin_match() for x in games]
+    pygame.display.update()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        [x.simulation_tick() for x in games]
+        pygame.display.update(wall.draw())
+        timer.tick(frame_rate)
+    pygame.quit()
+    return
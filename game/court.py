@@ -1,39 +1,166 @@
+import functools
+import math
 import pygame
 import random
-from PIL import Image
+from enum import Enum
 from pydantic import BaseModel
 from pygame import Surface
 from typing import List, Dict, NamedTuple, Tuple, Optional
-from game.utils import ARC_PI, Color, Position, Dimension, Pixel, SpriteStyle, ratio, image_dimensions, find_trend
+from game.utils import ARC_PI, Color, Position, Dimension, Pixel, SpriteStyle, ratio, image_dimensions, convert, find_trend
 
+COURT_GEOMETRY_CACHE_SIZE = 8
+
+class Basket(Enum):
+    TOP = 0
+    BOTTOM = 1
+class CourtZone(Enum):
+    OUT = 0
+    PAINT = 1
+    MID = 2
+    THREE = 3
+    LONG = 4
+    HALF = 5
+COURT_ZONES = tuple(CourtZone)
+# the Zone rating that applies to a shot or a pass into each zone
+COURT_ZONE_RANGES = {CourtZone.PAINT: "short", CourtZone.MID: "mid", CourtZone.THREE: "long", CourtZone.LONG: "long", CourtZone.HALF: "half"}
+# Play fields that are shots, and what each one scores
+SHOT_PLAYS = ("long", "three", "mid", "post", "drive")
+SHOT_POINTS = (3, 3, 2, 2, 2)
+class CourtGeometry:
+    # everything the markings and the zone lookup need for one screen size, shared by every court of that size
+    ZONE_CELL_SIZE = 4
+    def __init__(self, screen_size:Tuple[int, int]):
+        self.screen_size = Dimension.new(pair=screen_size)
+        self.court_scale_by = 29
+        self.top = self.screen_size.ratio_height(mul=1, div=self.court_scale_by)
+        self.bottom = self.screen_size.ratio_height(mul=self.court_scale_by - 1, div=self.court_scale_by)
+        self.height = self.bottom - self.top
+        # self.width = ratio(val=self.height, mul=0.531914893617)
+        self.width = ratio(val=self.height, mul=0.631914893617)
+        self.left = self.screen_size.ratio_width(div=2) - ratio(val=self.width, div=2)
+        self.right = self.screen_size.ratio_width(div=2) + ratio(val=self.width, div=2)
+        dimension = Dimension(width=self.width, height=self.height)
+        self.center_x = self.left + dimension.ratio_width(div=2)
+        self.half_height = self.top + dimension.ratio_height(div=2)
+        self.outer_line_height = dimension.ratio_height(mul=14, div=94)
+        self.outer_line_left = dimension.ratio_width(mul=3, div=50)
+        self.outer_line_right = dimension.ratio_width(mul=47, div=50)
+        self.outer_box_width = dimension.ratio_width(mul=16, div=50)
+        self.inner_box_width = dimension.ratio_width(mul=12, div=50)
+        self.box_height = dimension.ratio_height(mul=19, div=94)
+        self.box_circle_radius = dimension.ratio_width(mul=6, div=50)
+        self.inner_center_circle_radius = dimension.ratio_width(mul=2, div=50)
+        self.outer_center_circle_radius = dimension.ratio_width(mul=6, div=50)
+        self.basket_radius = dimension.ratio_width(mul=1.5, div=50)
+        # how far past the three point line a shot still counts as a three rather than a long one
+        self.long_range = dimension.ratio_height(mul=6, div=94)
+        self.zone_columns = max(1, -(-self.width // self.ZONE_CELL_SIZE))
+        self.zone_rows = max(1, -(-self.height // self.ZONE_CELL_SIZE))
+        self.zones = [self.zone_grid(basket=x) for x in Basket]
+        # built once per screen size and shared by every caller, they are read on every tick and must not be moved
+        self.basket_positions = [Position(x=self.center_x, y=self.top + self.basket_radius), Position(x=self.center_x, y=self.bottom - self.basket_radius)]
+        self.spacing_spots = [[Position(*y) for y in self.basket_spacing_spots(basket=x)] for x in Basket]
+    def get_basket_position(self, basket:Basket) -> Position:
+        return self.basket_positions[basket.value]
+    def basket_spacing_spots(self, basket:Basket) -> List[Tuple[int, int]]:
+        # where off-ball attackers spread out: both corners, both wings just outside the arc, and the top of the key
+        arc_height = (self.outer_line_height * 2) + (self.long_range // 2)
+        wing_height = self.outer_line_height + (self.long_range // 2)
+        spots = [(self.left + (self.outer_line_left // 2), self.outer_line_height // 2), (self.right - (self.outer_line_left // 2), self.outer_line_height // 2), (self.left + self.outer_line_left, wing_height), (self.right - self.outer_line_left, wing_height), (self.center_x, arc_height)]
+        return [(x, self.top + distance if basket is Basket.TOP else self.bottom - distance) for x, distance in spots]
+    def get_spacing_spot(self, basket:Basket, index:int) -> Position:
+        spots = self.spacing_spots[basket.value]
+        return spots[index % len(spots)]
+    def arc_half_width(self, distance:int, margin:int=0) -> float:
+        # half width of the three point line at a distance from the baseline, straight corners then an ellipse, grown by margin
+        half_width = (self.outer_line_right - self.outer_line_left) / 2 + margin
+        if distance < self.outer_line_height:
+            return half_width
+        height = self.outer_line_height + margin
+        if distance >= self.outer_line_height + height:
+            return -1
+        return half_width * math.sqrt(1 - ((distance - self.outer_line_height) / height) ** 2)
+    def fill_zone(self, row:bytearray, half_width:float, zone:CourtZone):
+        if half_width < 0:
+            return
+        # a cell belongs to the zone its center is in
+        arc_center_x = self.left + (self.outer_line_left + self.outer_line_right) / 2
+        offset = self.left + self.ZONE_CELL_SIZE / 2
+        start = max(0, math.ceil((arc_center_x - half_width - offset) / self.ZONE_CELL_SIZE))
+        end = min(self.zone_columns, math.floor((arc_center_x + half_width - offset) / self.ZONE_CELL_SIZE) + 1)
+        if start < end:
+            row[start:end] = bytes([zone.value]) * (end - start)
+        return
+    def zone_row(self, y:int, basket:Basket) -> bytearray:
+        distance = y - self.top if basket is Basket.TOP else self.bottom - y
+        if distance >= self.half_height - self.top:
+            return bytearray([CourtZone.HALF.value]) * self.zone_columns
+        row = bytearray([CourtZone.LONG.value]) * self.zone_columns
+        self.fill_zone(row=row, half_width=self.arc_half_width(distance=distance, margin=self.long_range), zone=CourtZone.THREE)
+        self.fill_zone(row=row, half_width=self.arc_half_width(distance=distance), zone=CourtZone.MID)
+        if distance < self.box_height:
+            self.fill_zone(row=row, half_width=self.outer_box_width / 2, zone=CourtZone.PAINT)
+        return row
+    def zone_grid(self, basket:Basket) -> bytearray:
+        # built a row of cells at a time from the zone boundaries, cheap enough to do on every resize
+        grid = bytearray()
+        for row in range(self.zone_rows):
+            grid += self.zone_row(y=self.top + (row * self.ZONE_CELL_SIZE) + self.ZONE_CELL_SIZE // 2, basket=basket)
+        return grid
+    def get_zone(self, x:int, y:int, basket:Basket) -> CourtZone:
+        column = (x - self.left) // self.ZONE_CELL_SIZE
+        row = (y - self.top) // self.ZONE_CELL_SIZE
+        if column < 0 or row < 0 or column >= self.zone_columns or row >= self.zone_rows:
+            return CourtZone.OUT
+        return COURT_ZONES[self.zones[basket.value][(row * self.zone_columns) + column]]
+@functools.lru_cache(maxsize=COURT_GEOMETRY_CACHE_SIZE)
+def get_court_geometry(screen_size:Tuple[int, int]) -> CourtGeometry:
+    return CourtGeometry(screen_size=screen_size)
 class CourtArea:
-    def __init__(self, position:Position, dimension:Dimension):
+    def __init__(self, position:Position, dimension:Dimension, rng:random.Random=None):
         self.position = position
         self.dimension = dimension
+        self.rng = rng if rng is not None else random.Random()
     def random_position(self, player_width:int, player_height:int) -> Position:
-        x = random.randint(self.position.x, self.position.x + self.dimension.width - player_width)
-        y = random.randint(self.position.y, self.position.y + self.dimension.height - player_height)
+        x = self.rng.randint(self.position.x, self.position.x + self.dimension.width - player_width)
+        y = self.rng.randint(self.position.y, self.position.y + self.dimension.height - player_height)
         return Position(x=x, y=y)
 class Court(pygame.sprite.Sprite):
     DEFAULT_COURT_STYLE = SpriteStyle(color=Color.VERY_LIGHT_ORANGE, width=0)
     DEFAULT_MARKING_STYLE = SpriteStyle(color=Color.LIGHT_GREY, width=2)
     DEFAULT_BASKET_STYLE = SpriteStyle(color=Color.SEMI_RED, width=4)
+    LAYER_COLOR_KEY = (255, 0, 255)
     # def __init__(self, window:Surface, court_style:Color=Color.VERY_LIGHT_ORANGE, marking_color:Color=Color.LIGHT_GREY, basket_color:Color=Color.SEMI_RED, border_width:int=1, border_radius:int=0, court_width:int=0, marking_width:int=2, marking_radius:int=0):
-    def __init__(self, window:Surface, court_style:SpriteStyle=DEFAULT_COURT_STYLE, marking_style:SpriteStyle=DEFAULT_MARKING_STYLE, basket_style:SpriteStyle=DEFAULT_BASKET_STYLE):
+    def __init__(self, window:Optional[Surface], court_style:SpriteStyle=DEFAULT_COURT_STYLE, marking_style:SpriteStyle=DEFAULT_MARKING_STYLE, basket_style:SpriteStyle=DEFAULT_BASKET_STYLE, rng:random.Random=None, screen_size:Tuple[int, int]=None):
         super().__init__()
         self.window = window
+        # headless courts have no window to measure, only the size it would have
+        self.window_size = tuple(screen_size) if screen_size is not None else window.get_size()
+        self.rng = rng if rng is not None else random.Random()
         self.court_style = court_style
         self.marking_style = marking_style
         self.basket_style = basket_style
-        self.screen_size = Dimension.new(pair=self.window.get_size())
-        self.court_scale_by = 29
-        self.top = self.screen_size.ratio_height(mul=1, div=self.court_scale_by)
-        self.bottom = self.screen_size.ratio_height(mul=self.court_scale_by - 1, div=self.court_scale_by)
-        self.height = self.bottom - self.top
-        # self.width = ratio(val=self.height, mul=0.531914893617)
-        self.width = ratio(val=self.height, mul=0.631914893617)
-        self.left = self.screen_size.ratio_width(div=2) - ratio(val=self.width, div=2)
-        self.right = self.screen_size.ratio_width(div=2) + ratio(val=self.width, div=2)
+        self.canvas = self.window
+        self.markings_layer = None
+        self.markings_layer_position = None
+        self.markings_layer_key = None
+        self.resize()
+    def get_window_size(self) -> Tuple[int, int]:
+        return self.window.get_size() if self.window is not None else self.window_size
+    def set_window(self, window:Surface):
+        self.window = window
+        self.canvas = window
+        return
+    def resize(self):
+        self.geometry = get_court_geometry(screen_size=self.get_window_size())
+        self.screen_size = self.geometry.screen_size
+        self.court_scale_by = self.geometry.court_scale_by
+        self.top = self.geometry.top
+        self.bottom = self.geometry.bottom
+        self.height = self.geometry.height
+        self.width = self.geometry.width
+        self.left = self.geometry.left
+        self.right = self.geometry.right
         self.position = Position(x=self.left, y=self.top)
         self.dimension = Dimension(width=self.width, height=self.height)
         self.rect = [*self.position.get(), *self.dimension.get()]
@@ -43,33 +170,38 @@ class Court(pygame.sprite.Sprite):
         self.bottom_box_rect = None
         self.top_arc_rect = None
         self.bottom_arc_rect = None
+        return
     def get_home_area(self) -> "CourtArea":
-        return CourtArea(position=Position(x=self.left, y=self.top), dimension=Dimension(width=self.dimension.width, height=self.dimension.ratio_height(div=2)))
+        return CourtArea(position=Position(x=self.left, y=self.top), dimension=Dimension(width=self.dimension.width, height=self.dimension.ratio_height(div=2)), rng=self.rng)
     def get_away_area(self) -> "CourtArea":
-        return CourtArea(position=Position(x=self.left, y=self.top + self.dimension.ratio_height(div=2)), dimension=Dimension(width=self.dimension.width, height=self.dimension.ratio_height(div=2)))
+        return CourtArea(position=Position(x=self.left, y=self.top + self.dimension.ratio_height(div=2)), dimension=Dimension(width=self.dimension.width, height=self.dimension.ratio_height(div=2)), rng=self.rng)
+    def get_zone(self, x:int, y:int, basket:Basket) -> CourtZone:
+        return self.geometry.get_zone(x=x, y=y, basket=basket)
+    def get_basket_position(self, basket:Basket) -> Position:
+        return self.geometry.get_basket_position(basket=basket)
+    def get_spacing_spot(self, basket:Basket, index:int) -> Position:
+        return self.geometry.get_spacing_spot(basket=basket, index=index)
     def get_perimeter_positions(self):
         return
     def draw_court(self):
         self.rect = [*self.position.get(), *self.dimension.get()]
-        self.count_rect = pygame.draw.rect(surface=self.window, color=self.court_style.color, rect=self.rect, width=self.court_style.width, border_radius=self.court_style.radius)
+        self.count_rect = pygame.draw.rect(surface=self.canvas, color=self.court_style.color, rect=self.rect, width=self.court_style.width, border_radius=self.court_style.radius)
         return
     def draw_mid_line(self):
-        half_height = self.top + self.dimension.ratio_height(div=2)
-        mid_line_start_position = Position(x=self.left, y=half_height)
-        mid_line_end_position = Position(x=self.right, y=half_height)
-        self.mid_line_rect = pygame.draw.line(surface=self.window, color=self.marking_style.color, start_pos=mid_line_start_position.get(), end_pos=mid_line_end_position.get(), width=self.marking_style.width)
+        mid_line_start_position = Position(x=self.left, y=self.geometry.half_height)
+        mid_line_end_position = Position(x=self.right, y=self.geometry.half_height)
+        self.mid_line_rect = pygame.draw.line(surface=self.canvas, color=self.marking_style.color, start_pos=mid_line_start_position.get(), end_pos=mid_line_end_position.get(), width=self.marking_style.width)
         return
     def draw_box(self, box_width:int, box_height:int, box_y:int):
-        box_left = self.dimension.ratio_width(div=2) - ratio(val=box_width, div=2) + self.left
+        box_left = self.geometry.center_x - ratio(val=box_width, div=2)
         box_position = Position(x=box_left, y=box_y)
         box_dimension = Dimension(width=box_width, height=box_height)
         box_rect_area = [*box_position.get(), *box_dimension.get()]
-        box_rect = pygame.draw.rect(surface=self.window, color=self.marking_style.color, rect=box_rect_area, width=self.marking_style.width, border_radius=self.marking_style.radius)
+        box_rect = pygame.draw.rect(surface=self.canvas, color=self.marking_style.color, rect=box_rect_area, width=self.marking_style.width, border_radius=self.marking_style.radius)
         return box_rect
     def draw_box_circle(self, center_y:int):
-        box_circle_radius = self.dimension.ratio_width(mul=6, div=50)
-        box_circle_position = Position(x=self.left + self.dimension.ratio_width(div=2), y=center_y)
-        box_rect = pygame.draw.circle(surface=self.window, color=self.marking_style.color, center=box_circle_position.get(), radius=box_circle_radius, width=self.marking_style.width)
+        box_circle_position = Position(x=self.geometry.center_x, y=center_y)
+        box_rect = pygame.draw.circle(surface=self.canvas, color=self.marking_style.color, center=box_circle_position.get(), radius=self.geometry.box_circle_radius, width=self.marking_style.width)
         return box_rect
     def draw_box_circles(self, box_height:int):
         self.top_box_rect = self.draw_box_circle(center_y=self.top + box_height)
@@ -78,7 +210,7 @@ class Court(pygame.sprite.Sprite):
     def draw_outer_line(self, outer_line_left:int, outer_line_top:int, outer_line_height:int):
         outer_line_start = Position(x=self.left + outer_line_left, y=outer_line_top)
         outer_line_end = Position(x=self.left + outer_line_left, y=outer_line_top + outer_line_height)
-        pygame.draw.line(surface=self.window, color=self.marking_style.color, start_pos=outer_line_start.get(), end_pos=outer_line_end.get(), width=self.marking_style.width)
+        pygame.draw.line(surface=self.canvas, color=self.marking_style.color, start_pos=outer_line_start.get(), end_pos=outer_line_end.get(), width=self.marking_style.width)
         return
     def draw_arcs(self, outer_line_left:int, outer_line_right:int, outer_line_height:int):
         arc_rect_length = outer_line_height * 2
@@ -88,18 +220,18 @@ class Court(pygame.sprite.Sprite):
         # pygame.draw.arc(surface=self.window, color=self.marking_style.color, rect=(50, 50, 100, 100), start_angle=start_angle, stop_angle=stop_angle, width=self.marking_style.width)
         # pygame.draw.arc(surface=self.window, color=self.marking_style.color, rect=(50, 100, 100, 100), start_angle=start_angle, stop_angle=stop_angle, width=self.marking_style.width)
         # pygame.draw.arc(surface=self.window, color=self.marking_style.color, rect=(arc_start_x, arc_start_y, rect_width, arc_length), start_angle=start_angle, stop_angle=stop_angle, width=self.marking_style.width)
-        self.top_arc_rect = pygame.draw.arc(surface=self.window, color=self.marking_style.color, rect=arc_rect_area, start_angle=ARC_PI, stop_angle=ARC_PI * 2, width=self.marking_style.width)
+        self.top_arc_rect = pygame.draw.arc(surface=self.canvas, color=self.marking_style.color, rect=arc_rect_area, start_angle=ARC_PI, stop_angle=ARC_PI * 2, width=self.marking_style.width)
         # pygame.draw.line(surface=self.window, color=self.marking_style.color, start_pos=(arc_start_x, arc_start_y), end_pos=(arc_end_x, arc_end_y), width=self.marking_style.width)
         # pygame.draw.rect(surface=self.window, color=self.marking_style.color, rect=(arc_start_x, arc_start_y, rect_width, arc_length), width=self.marking_style.width, border_radius=self.marking_style.radius)
 
         arc_rect_area = (self.left + outer_line_left, self.bottom - arc_rect_length, rect_width, arc_rect_length)
-        self.bottom_arc_rect = pygame.draw.arc(surface=self.window, color=self.marking_style.color, rect=arc_rect_area, start_angle=0, stop_angle=ARC_PI, width=self.marking_style.width)
+        self.bottom_arc_rect = pygame.draw.arc(surface=self.canvas, color=self.marking_style.color, rect=arc_rect_area, start_angle=0, stop_angle=ARC_PI, width=self.marking_style.width)
         # self.bottom_arc_rect = pygame.draw.arc(surface=self.window, color=(50, 100, 200), rect=arc_rect_area, start_angle=0, stop_angle=ARC_PI, width=0)
         return
     def draw_mid_range(self):
-        outer_line_height = self.dimension.ratio_height(mul=14, div=94)
-        outer_line_left = self.dimension.ratio_width(mul=3, div=50)
-        outer_line_right = self.dimension.ratio_width(mul=47, div=50)
+        outer_line_height = self.geometry.outer_line_height
+        outer_line_left = self.geometry.outer_line_left
+        outer_line_right = self.geometry.outer_line_right
         self.draw_outer_line(outer_line_left=outer_line_left, outer_line_top=self.top, outer_line_height=outer_line_height)
         self.draw_outer_line(outer_line_left=outer_line_right, outer_line_top=self.top, outer_line_height=outer_line_height)
         self.draw_outer_line(outer_line_left=outer_line_left, outer_line_top=self.bottom - outer_line_height, outer_line_height=outer_line_height)
@@ -107,40 +239,38 @@ class Court(pygame.sprite.Sprite):
         self.draw_arcs(outer_line_left=outer_line_left, outer_line_right=outer_line_right, outer_line_height=outer_line_height)
         return
     def draw_boxes(self):
-        outer_width = self.dimension.ratio_width(mul=16, div=50)
-        inner_width = self.dimension.ratio_width(mul=12, div=50)
-        box_height = self.dimension.ratio_height(mul=19, div=94)
+        outer_width = self.geometry.outer_box_width
+        inner_width = self.geometry.inner_box_width
+        box_height = self.geometry.box_height
         self.draw_box(box_width=outer_width, box_height=box_height, box_y=self.top)
         self.draw_box(box_width=inner_width, box_height=box_height, box_y=self.top)
         self.draw_box(box_width=outer_width, box_height=box_height, box_y=self.bottom - box_height)
         self.draw_box(box_width=inner_width, box_height=box_height, box_y=self.bottom - box_height)
         self.draw_box_circles(box_height=box_height)
         return
-    def draw_center_circle(self, mul:int=1, div:int=1):
-        circle_radius = self.dimension.ratio_width(mul=mul, div=div)
-        circle_position = Position(x=self.left + self.dimension.ratio_width(div=2), y=self.top + self.dimension.ratio_height(div=2))
-        pygame.draw.circle(surface=self.window, color=self.marking_style.color, center=circle_position.get(), radius=circle_radius, width=self.marking_style.width)
+    def draw_center_circle(self, circle_radius:int):
+        circle_position = Position(x=self.geometry.center_x, y=self.geometry.half_height)
+        pygame.draw.circle(surface=self.canvas, color=self.marking_style.color, center=circle_position.get(), radius=circle_radius, width=self.marking_style.width)
         return
     def draw_inner_center_circle(self):
-        return self.draw_center_circle(mul=2, div=50)
+        return self.draw_center_circle(circle_radius=self.geometry.inner_center_circle_radius)
     def draw_outer_center_circle(self):
-        return self.draw_center_circle(mul=6, div=50)
+        return self.draw_center_circle(circle_radius=self.geometry.outer_center_circle_radius)
     def draw_center_circles(self):
         self.draw_inner_center_circle()
         self.draw_outer_center_circle()
         return
     def draw_basket(self, basket_radius:int, basket_y:int):
-        basket_position = Position(x=self.left + self.dimension.ratio_width(div=2), y=basket_y + basket_radius)
-        pygame.draw.circle(surface=self.window, color=self.basket_style.color, center=basket_position.get(), radius=basket_radius, width=self.basket_style.width)
+        basket_position = Position(x=self.geometry.center_x, y=basket_y + basket_radius)
+        pygame.draw.circle(surface=self.canvas, color=self.basket_style.color, center=basket_position.get(), radius=basket_radius, width=self.basket_style.width)
         return
     def draw_baskets(self):
-        basket_radius = self.dimension.ratio_width(mul=1.5, div=50)
+        basket_radius = self.geometry.basket_radius
         basket_diameter = basket_radius * 2
         self.draw_basket(basket_radius=basket_radius, basket_y=self.top)
         self.draw_basket(basket_radius=basket_radius, basket_y=self.bottom - basket_diameter)
         return
-    def update(self):
-        # if not self.game_area.contains(self.rect): self.kill()
+    def draw_markings(self):
         self.draw_court()
         self.draw_mid_line()
         self.draw_boxes()
@@ -148,6 +278,35 @@ class Court(pygame.sprite.Sprite):
         self.draw_baskets()
         self.draw_mid_range()
         return
+    def get_markings_layer_key(self):
+        return self.get_window_size(), self.court_style, self.marking_style, self.basket_style
+    def render_markings_layer(self):
+        if self.screen_size.get() != self.get_window_size():
+            self.resize()
+        # a colorkeyed opaque layer blits much faster than a per-pixel alpha one
+        layer = Surface(self.get_window_size())
+        layer.fill(self.LAYER_COLOR_KEY)
+        layer.set_colorkey(self.LAYER_COLOR_KEY, pygame.RLEACCEL)
+        self.canvas = layer
+        self.draw_markings()
+        self.canvas = self.window
+        # keep only the painted part of the window sized layer
+        bounds = layer.get_bounding_rect()
+        self.markings_layer = convert(surface=layer.subsurface(bounds).copy())
+        self.markings_layer_position = Position(x=bounds.x, y=bounds.y)
+        self.markings_layer_key = (self.get_window_size(), self.court_style.model_copy(), self.marking_style.model_copy(), self.basket_style.model_copy())
+        return
+    def get_markings_layer(self) -> Surface:
+        if self.markings_layer_key != self.get_markings_layer_key():
+            self.render_markings_layer()
+        return self.markings_layer
+    def blit_markings_layer(self, surface:Surface):
+        surface.blit(self.get_markings_layer(), self.markings_layer_position.get())
+        return
+    def update(self, interpolation:float=1.0):
+        # if not self.game_area.contains(self.rect): self.kill()
+        self.blit_markings_layer(surface=self.window)
+        return
 
 
 
@@ -0,0 +1,95 @@
+import random
+import numpy as np
+from game.assets import PLAYER_SCALED_WIDTH
+from game.court import Court, CourtZone, Basket, COURT_ZONE_RANGES, SHOT_PLAYS, SHOT_POINTS
+from typing import List, NamedTuple
+
+PASS_RANGES = ("short", "mid", "long", "half")
+ZONE_PLAYS = {CourtZone.PAINT: ("post", "drive"), CourtZone.MID: ("mid",), CourtZone.THREE: ("three",), CourtZone.LONG: ("long",)}
+# indexed by CourtZone value: the Zone rating that applies there and the shots that can be taken from there
+ZONE_RANGE_INDEXES = np.array([PASS_RANGES.index(COURT_ZONE_RANGES.get(x, "half")) for x in CourtZone], dtype=np.int64)
+ZONE_SHOTS = np.array([[1.0 if y in ZONE_PLAYS.get(x, ()) else 0.0 for y in SHOT_PLAYS] for x in CourtZone])
+SHOT_VALUES = np.array(SHOT_POINTS, dtype=float)
+DRIVE = SHOT_PLAYS.index("drive")
+# defenders further than this from an attacker, or from a passing lane, do not affect the play
+GUARD_DISTANCE = PLAYER_SCALED_WIDTH * 2
+LANE_DISTANCE = PLAYER_SCALED_WIDTH
+
+class TeamRatings:
+    # every rating the decision engine reads, as probabilities in player order, so no tick goes through pydantic attributes
+    def __init__(self, players:List["InGamePlayer"]):
+        models = [x.player for x in players]
+        self.shooting = np.array([[getattr(x.shooting_rating, y) for y in SHOT_PLAYS] for x in models], dtype=float) / 100
+        self.shot_preference = np.array([[getattr(x.attack_pref, y) for y in SHOT_PLAYS] for x in models], dtype=float) / 100
+        self.pass_preference = np.array([x.attack_pref.passing for x in models], dtype=float) / 100
+        self.passing = np.array([[getattr(x.passing, y) for y in PASS_RANGES] for x in models], dtype=float) / 100
+        self.blocking = np.array([[getattr(x.blocking, y) for y in PASS_RANGES] for x in models], dtype=float) / 100
+        self.pass_stealing = np.array([x.stealing.on_pass for x in models], dtype=float) / 100
+        self.ball_stealing = np.array([x.stealing.on_ball for x in models], dtype=float) / 100
+        self.half_width = np.array([x.scaled_dimension.width // 2 for x in players], dtype=np.int64)
+        self.half_height = np.array([x.scaled_dimension.height // 2 for x in players], dtype=np.int64)
+class Decision(NamedTuple):
+    action:str
+    # shot play index for shots, teammate index for passes, defender index for steals
+    target:int
+    success:bool
+class AttackDecisions:
+    ADVANCE, SHOT, PASS, STEAL = "advance", "shot", "pass", "steal"
+    def __init__(self, court:Court):
+        self.court = court
+    def centers(self, players:List["InGamePlayer"], ratings:TeamRatings):
+        x = np.array([player.position.x for player in players], dtype=np.int64) + ratings.half_width
+        y = np.array([player.position.y for player in players], dtype=np.int64) + ratings.half_height
+        return x, y
+    def zones(self, x:np.ndarray, y:np.ndarray, basket:Basket) -> np.ndarray:
+        geometry = self.court.geometry
+        grid = np.frombuffer(geometry.zones[basket.value], dtype=np.uint8)
+        column = (x - geometry.left) // geometry.ZONE_CELL_SIZE
+        row = (y - geometry.top) // geometry.ZONE_CELL_SIZE
+        inside = (column >= 0) & (row >= 0) & (column < geometry.zone_columns) & (row < geometry.zone_rows)
+        return np.where(inside, grid[np.where(inside, (row * geometry.zone_columns) + column, 0)], CourtZone.OUT.value)
+    def pass_ranges(self, distance:np.ndarray) -> np.ndarray:
+        # short passes stay inside a quarter of the court width, half court ones cross the mid line
+        court = self.court
+        return np.searchsorted(np.array([court.width // 4, court.width // 2, court.height // 2]), distance)
+    def decide(self, attackers:List["InGamePlayer"], attack_ratings:TeamRatings, defenders:List["InGamePlayer"], defense_ratings:TeamRatings, holder:int, basket:Basket, rng:random.Random) -> Decision:
+        attack_x, attack_y = self.centers(players=attackers, ratings=attack_ratings)
+        defense_x, defense_y = self.centers(players=defenders, ratings=defense_ratings)
+        zones = self.zones(x=attack_x, y=attack_y, basket=basket)
+        # how tightly each defender guards each attacker, 1 when on top of them and 0 from GUARD_DISTANCE out
+        guarding = np.clip(1 - (np.hypot(defense_x[:, None] - attack_x[None, :], defense_y[:, None] - attack_y[None, :]) / GUARD_DISTANCE), 0, 1)
+        steal = (defense_ratings.ball_stealing * guarding[:, holder]).max()
+        if rng.random() < steal:
+            return Decision(action=self.STEAL, target=int((defense_ratings.ball_stealing * guarding[:, holder]).argmax()), success=True)
+        # every attacker's chance to score each shot from where they stand, blocked by the best placed defender
+        blocked = (defense_ratings.blocking[:, ZONE_RANGE_INDEXES[zones]] * guarding).max(axis=0)
+        shot_probabilities = attack_ratings.shooting * ZONE_SHOTS[zones] * (1 - blocked)[:, None]
+        shot_values = (shot_probabilities * SHOT_VALUES).max(axis=1)
+        # a pass is cut out by the defender closest to its lane, then is worth what the receiver can score
+        lane_x, lane_y = attack_x - attack_x[holder], attack_y - attack_y[holder]
+        lane_length = np.maximum(lane_x ** 2 + lane_y ** 2, 1)
+        along = np.clip((((defense_x - attack_x[holder])[:, None] * lane_x) + ((defense_y - attack_y[holder])[:, None] * lane_y)) / lane_length, 0, 1)
+        lane_distance = np.hypot(attack_x[holder] + (along * lane_x) - defense_x[:, None], attack_y[holder] + (along * lane_y) - defense_y[:, None])
+        intercepted = (defense_ratings.pass_stealing[:, None] * np.clip(1 - (lane_distance / LANE_DISTANCE), 0, 1)).max(axis=0)
+        pass_probabilities = attack_ratings.passing[holder, self.pass_ranges(distance=np.sqrt(lane_length))] * (1 - intercepted)
+        pass_scores = attack_ratings.pass_preference[holder] * pass_probabilities * shot_values
+        pass_scores[holder] = 0
+        shot_scores = attack_ratings.shot_preference[holder] * shot_probabilities[holder] * SHOT_VALUES
+        # driving on is worth a finish at the rim, once in the paint the holder finishes instead
+        advance_score = 0.0 if zones[holder] == CourtZone.PAINT.value else attack_ratings.shot_preference[holder, DRIVE] * attack_ratings.shooting[holder, DRIVE] * SHOT_VALUES[DRIVE]
+        scores = np.concatenate(([advance_score], shot_scores, pass_scores))
+        total = scores.sum()
+        if total <= 0:
+            return Decision(action=self.ADVANCE, target=holder, success=True)
+        choice = min(int(np.searchsorted(np.cumsum(scores), rng.random() * total, side="right")), len(scores) - 1)
+        if choice == 0:
+            return Decision(action=self.ADVANCE, target=holder, success=True)
+        if choice <= len(SHOT_PLAYS):
+            play = choice - 1
+            return Decision(action=self.SHOT, target=play, success=rng.random() < shot_probabilities[holder, play])
+        target = choice - 1 - len(SHOT_PLAYS)
+        success = rng.random() < pass_probabilities[target]
+        if success:
+            return Decision(action=self.PASS, target=target, success=True)
+        # a pass that does not arrive ends with whoever was closest to its lane
+        return Decision(action=self.PASS, target=int(lane_distance[:, target].argmin()), success=False)
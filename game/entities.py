@@ -1,8 +1,13 @@
+import array
+import math
 import pygame
 from enum import Enum
 from pygame import Surface, Rect
-from game.court import Court, CourtArea
-from game.utils import ARC_PI, Color, Position, Dimension, Pixel, SpriteStyle, ratio, image_dimensions, find_trend
+from game.court import Court, CourtArea, Basket, SHOT_PLAYS, SHOT_POINTS
+from game.decisions import TeamRatings, AttackDecisions
+from game.spatial import SpatialHash
+from game.assets import SpriteAsset, load_sprite_asset, assets_overlap, PLAYER_SCALED_WIDTH
+from game.utils import ARC_PI, Color, Position, Dimension, Pixel, SpriteStyle, ratio, image_dimensions, interpolate, find_trend
 from pydantic import BaseModel
 from typing import List, Dict, Tuple, NamedTuple, TypeVar, Generic, Optional, Callable
 
@@ -52,45 +57,58 @@ class Team(BaseModel):
     name:str
     players:List[Player]
 class Ball(pygame.sprite.Sprite):
+    IMAGE_FILE_PATH = f"../game/images/basketball.png"
+    SCALED_WIDTH = 30
     def __init__(self, window:Surface, court:Court):
         super().__init__()
         self.window = window
         self.court = court
         self.player_in_possession = None
         self.team_in_possession = None
-        self.image_file_path = f"../game/images/basketball.png"
+        # projectile pool slot while the ball is in the air
+        self.flight_slot = None
+        self.image_file_path = self.IMAGE_FILE_PATH
         self.position = None
-        self.image = pygame.image.load(self.image_file_path).convert_alpha()
-        self.actual_image_dimensions = image_dimensions(image_file_path=self.image_file_path)
-        self.scaled_width = 30
-        self.scaled_height = ratio(val=self.scaled_width, mul=self.actual_image_dimensions[1], div=self.actual_image_dimensions[0])
-        self.scaled_dimension = Dimension(width=self.scaled_width, height=self.scaled_height)
-        self.scaled_image = pygame.transform.scale(self.image, self.scaled_dimension.get())
+        self.previous_position = None
+        self.scaled_width = self.SCALED_WIDTH
+        self.asset:SpriteAsset = load_sprite_asset(image_file_path=self.image_file_path, scaled_width=self.scaled_width)
+        self.image = self.asset.image
+        self.actual_image_dimensions = self.asset.actual_dimension.get()
+        self.scaled_height = self.asset.scaled_dimension.height
+        self.scaled_dimension = self.asset.scaled_dimension
+        self.scaled_image = self.asset.scaled_image
         self.rect = self.image.get_rect()
+        self.rect_cache = Rect((0, 0), self.scaled_dimension.get())
+        self.probe_rect_cache = Rect((0, 0), self.scaled_dimension.get())
     def starting_position(self):
         self.unset_possession()
+        self.flight_slot = None
         self.position = Position(x=self.court.left + self.court.dimension.ratio_width(div=2), y=self.court.top + self.court.dimension.ratio_height(div=2))
         # print(f"[RESET] BALL: {self.position.get()} | {id(self)}")
         return
     def get_rect(self, x:int=None, y:int=None) -> Rect:
-        position = Position.new(pair=self.position.get())
-        position.x = position.x if x is None else x
-        position.y = position.y if y is None else y
-        dimension = self.scaled_dimension
-        return Rect(position.get(), dimension.get())
-    def update(self):
+        # the returned Rect is reused and moved in place on the next call, copy it to keep it
+        rect = self.rect_cache if x is None and y is None else self.probe_rect_cache
+        rect.x = self.position.x if x is None else x
+        rect.y = self.position.y if y is None else y
+        return rect
+    def get_render_position(self, interpolation:float=1.0) -> Tuple[int, int]:
+        return interpolate(previous=self.previous_position, current=self.position.get(), interpolation=interpolation)
+    def update(self, interpolation:float=1.0):
         # print(f"[UPDATE] BALL: {self.position.get()} | {id(self)}")
         # if self.position is None: return
         # pygame.draw.circle(surface=self.window, color=self.)
-        self.window.blit(self.scaled_image, self.position.get())
+        self.window.blit(self.scaled_image, self.get_render_position(interpolation=interpolation))
         return
     def is_in_possession(self) -> bool:
         return self.player_in_possession is not None
     def is_not_in_possession(self) -> bool:
         return self.player_in_possession is None
+    def is_in_flight(self) -> bool:
+        return self.flight_slot is not None
     def sync_ball_position_to_possession(self):
         if self.is_in_possession():
-            self.position = Position.copy(position=self.player_in_possession.position)
+            self.position.set(x=self.player_in_possession.position.x, y=self.player_in_possession.position.y)
         return
     def set_possession(self, player:"InGamePlayer", team:"InGameTeam"):
         self.player_in_possession = player
@@ -101,6 +119,7 @@ class Ball(pygame.sprite.Sprite):
         self.team_in_possession = None
         return
 class InGamePlayer(pygame.sprite.Sprite):
+    SCALED_WIDTH = PLAYER_SCALED_WIDTH
     def __init__(self, window:Surface, court:Court, ball:Ball, player:Player, attack_area:CourtArea, defense_area:CourtArea):
         super().__init__()
         self.window = window
@@ -109,28 +128,51 @@ class InGamePlayer(pygame.sprite.Sprite):
         self.player = player
         self.attack_area = attack_area
         self.defense_area = defense_area
+        self.position_view = None
         self.position = None
-        self.image = pygame.image.load(self.player.image_file_path).convert_alpha()
-        self.actual_image_dimensions = image_dimensions(image_file_path=self.player.image_file_path)
-        self.scaled_width = 75
-        self.scaled_height = ratio(val=self.scaled_width, mul=self.actual_image_dimensions[1], div=self.actual_image_dimensions[0])
-        self.scaled_dimension = Dimension(width=self.scaled_width, height=self.scaled_height)
-        self.scaled_image = pygame.transform.scale(self.image, self.scaled_dimension.get())
+        self.previous_position = None
+        self.scaled_width = self.SCALED_WIDTH
+        self.asset:SpriteAsset = load_sprite_asset(image_file_path=self.player.image_file_path, scaled_width=self.scaled_width)
+        self.image = self.asset.image
+        self.actual_image_dimensions = self.asset.actual_dimension.get()
+        self.scaled_height = self.asset.scaled_dimension.height
+        self.scaled_dimension = self.asset.scaled_dimension
+        self.scaled_image = self.asset.scaled_image
         self.rect = self.image.get_rect()
+        self.rect_cache = Rect((0, 0), self.scaled_dimension.get())
+        self.probe_rect_cache = Rect((0, 0), self.scaled_dimension.get())
         self.stamina = self.player.stamina
+    @property
+    def position(self) -> Position:
+        return self._position
+    @position.setter
+    def position(self, position:Position):
+        # once bound to an array store, assignments write through to the store row instead of replacing the view
+        if self.position_view is not None and position is not None:
+            self.position_view.x, self.position_view.y = position.get()
+            position = self.position_view
+        self._position = position
+    def bind_position(self, position_view:Position):
+        if self.position is not None:
+            position_view.x, position_view.y = self.position.get()
+        self.position_view = position_view
+        self._position = position_view
+        return
     def get_rect(self, x:int=None, y:int=None) -> Rect:
-        position = Position.new(pair=self.position.get())
-        position.x = position.x if x is None else x
-        position.y = position.y if y is None else y
-        dimension = self.scaled_dimension
-        return Rect(position.get(), dimension.get())
-    def update(self):
+        # the returned Rect is reused and moved in place on the next call, copy it to keep it
+        rect = self.rect_cache if x is None and y is None else self.probe_rect_cache
+        rect.x = self.position.x if x is None else x
+        rect.y = self.position.y if y is None else y
+        return rect
+    def get_render_position(self, interpolation:float=1.0) -> Tuple[int, int]:
+        return interpolate(previous=self.previous_position, current=self.position.get(), interpolation=interpolation)
+    def update(self, interpolation:float=1.0):
         # print(f"[UPDATE][{self.player.name}] {self.position.get()}")
         # if not self.game_area.contains(self.rect): self.kill()
         # self.position = self.defense_area.starting_position(player_width=self.scaled_dimension.width, player_height=self.scaled_dimension.height) if self.position is None else self.position
         # print(f"updating {self.player.name} @ {self.position}")
         # dime = self.scaled_image.get_rect(center=self.window.get_rect())
-        self.window.blit(self.scaled_image, self.position.get())
+        self.window.blit(self.scaled_image, self.get_render_position(interpolation=interpolation))
         return
 class InGameTeam(pygame.sprite.Sprite):
     def __init__(self, window:Surface, court:Court, ball:Ball, team:Team, is_home:bool):
@@ -144,63 +186,183 @@ class InGameTeam(pygame.sprite.Sprite):
         court_away_area = court.get_away_area()
         self.attack_area = court_away_area if self.is_home else court_home_area
         self.defense_area = court_away_area if self.is_home else court_home_area
+        self.attack_basket = Basket.BOTTOM if self.is_home else Basket.TOP
         self.players = [InGamePlayer(window=self.window, court=self.court, ball=self.ball, player=x, attack_area=self.attack_area, defense_area=self.defense_area) for x in team.players]
         self.player_sprites = pygame.sprite.Group(*self.players)
-    def update(self):
+        self.ratings = TeamRatings(players=self.players)
+        self.points = 0
+        self.attempts = array.array('q', [0] * len(SHOT_PLAYS))
+        self.makes = array.array('q', [0] * len(SHOT_PLAYS))
+    def reset_stats(self):
+        self.points = 0
+        self.attempts[:] = array.array('q', [0] * len(SHOT_PLAYS))
+        self.makes[:] = array.array('q', [0] * len(SHOT_PLAYS))
+        return
+    def record_shot(self, play:int, made:bool):
+        self.attempts[play] += 1
+        if made:
+            self.makes[play] += 1
+            self.points += SHOT_POINTS[play]
+        return
+    def update(self, interpolation:float=1.0):
         # if not self.game_area.contains(self.rect): self.kill()
         # [x.update() for x in self.players]
-        self.player_sprites.update()
+        self.player_sprites.update(interpolation)
         return
 class Strategy:
-    def __init__(self, court:Court, ball:Ball):
+    def __init__(self, court:Court, ball:Ball, spatial_hash:SpatialHash=None, pixel_collision:bool=False, navigation:"NavigationGrid"=None):
         self.court = court
         self.ball = ball
+        self.spatial_hash = spatial_hash
+        self.pixel_collision = pixel_collision
+        # without a navigation grid players head straight for their target
+        self.navigation = navigation
+        # strategies draw from the court's match rng so a seeded match replays exactly
+        self.rng = court.rng
     def execute(self, team:"InGameTeam"):
         pass
+    def nearby_players(self, player:InGamePlayer, all_players:List[InGamePlayer], x:int=None, y:int=None):
+        if self.spatial_hash is None:
+            return all_players
+        return self.spatial_hash.query(rect=player.get_rect(x=x, y=y))
+    def player_moved(self, player:InGamePlayer):
+        if self.spatial_hash is not None:
+            self.spatial_hash.update(sprite=player)
+        return
+    def move_player_towards(self, player:InGamePlayer, all_players:List[InGamePlayer], x:int, y:int):
+        # one speed step along each axis, an axis is skipped when the step would collide
+        if self.navigation is not None:
+            x, y = self.navigation.next_waypoint(player=player, x=x, y=y)
+        trend_x = find_trend(x - player.position.x)
+        x = player.position.x + player.player.trend_speed(trend=trend_x)
+        if self.is_player_not_colliding(player=player, all_players=self.nearby_players(player=player, all_players=all_players, x=x, y=None), x=x, y=None, pixel_collision=self.pixel_collision):
+            player.position.x = x
+
+        trend_y = find_trend(y - player.position.y)
+        y = player.position.y + player.player.trend_speed(trend=trend_y)
+        if self.is_player_not_colliding(player=player, all_players=self.nearby_players(player=player, all_players=all_players, x=player.position.x, y=y), x=player.position.x, y=y, pixel_collision=self.pixel_collision):
+            player.position.y = y
+        self.player_moved(player=player)
+        return
     @classmethod
-    def is_player_colliding(cls, player:InGamePlayer, all_players:List[InGamePlayer], x:int=None, y:int=None):
+    def is_player_colliding(cls, player:InGamePlayer, all_players:List[InGamePlayer], x:int=None, y:int=None, pixel_collision:bool=False):
+        player_rect = player.get_rect(x=x, y=y)
         for all_player in all_players:
-            if all_player.player.name == player.player.name:
+            if all_player is player:
                 continue
-            is_colliding = pygame.Rect.colliderect(all_player.get_rect(), player.get_rect(x=x, y=y))
+            all_player_rect = all_player.get_rect()
+            is_colliding = pygame.Rect.colliderect(all_player_rect, player_rect)
+            if is_colliding and pixel_collision:
+                is_colliding = assets_overlap(asset=player.asset, rect=player_rect, other_asset=all_player.asset, other_rect=all_player_rect)
             if is_colliding:
                 return True
         return False
     @classmethod
-    def is_player_not_colliding(cls, player:InGamePlayer, all_players:List[InGamePlayer], x:int=None, y:int=None):
-        return not cls.is_player_colliding(player=player, all_players=all_players, x=x, y=y)
+    def is_player_not_colliding(cls, player:InGamePlayer, all_players:List[InGamePlayer], x:int=None, y:int=None, pixel_collision:bool=False):
+        return not cls.is_player_colliding(player=player, all_players=all_players, x=x, y=y, pixel_collision=pixel_collision)
 class LooseBall(Strategy):
-    def __init__(self, court:Court, ball:Ball):
-        super().__init__(court=court, ball=ball)
-    def execute(self, teams:List["InGameTeam"]):
+    def __init__(self, court:Court, ball:Ball, spatial_hash:SpatialHash=None, pixel_collision:bool=False, navigation:"NavigationGrid"=None):
+        super().__init__(court=court, ball=ball, spatial_hash=spatial_hash, pixel_collision=pixel_collision, navigation=navigation)
+    def execute(self, teams:List["InGameTeam"], x:int=None, y:int=None):
+        # everyone chases (x, y), the ball itself unless told where it is going to be
+        target_x, target_y = (self.ball.position.x, self.ball.position.y) if x is None else (x, y)
         all_players = [y for x in teams for y in x.players]
         for team in teams:
             for player in team.players:
                 # player.chase_ball()
-                trend_x = find_trend(self.ball.position.x - player.position.x)
-                x = player.position.x + player.player.trend_speed(trend=trend_x)
-                if self.is_player_not_colliding(player=player, all_players=all_players, x=x, y=None):
-                    player.position.x = x
-
-                trend_y = find_trend(self.ball.position.y - player.position.y)
-                y = player.position.y + player.player.trend_speed(trend=trend_y)
-                if self.is_player_not_colliding(player=player, all_players=all_players, x=player.position.x, y=y):
-                    player.position.y = y
+                self.move_player_towards(player=player, all_players=all_players, x=target_x, y=target_y)
         return
 class SimpleAttack(Strategy):
-    def __init__(self, court:Court, ball:Ball):
-        super().__init__(court=court, ball=ball)
+    # chance per tick that the holder stops to weigh every shot and pass, otherwise they keep driving at the basket
+    DECISION_CHANCE = 1 / 20
+    # pixels per tick in the air
+    SHOT_SPEED = 12
+    PASS_SPEED = 18
+    SHOT_FLIGHT, PASS_FLIGHT = 1, 2
+    def __init__(self, court:Court, ball:Ball, spatial_hash:SpatialHash=None, pixel_collision:bool=False, navigation:"NavigationGrid"=None, projectiles:"ProjectilePool"=None):
+        super().__init__(court=court, ball=ball, spatial_hash=spatial_hash, pixel_collision=pixel_collision, navigation=navigation)
+        self.decisions = AttackDecisions(court=court)
+        # without a pool shots and passes resolve the moment they are decided
+        self.projectiles = projectiles
     def execute(self, teams:List["InGameTeam"]):
-        for team in teams:
-            for player in team.players:
-                if player.player.name == self.ball.player_in_possession.player.name:
-                    # player.advance_ball()
-                    self.do_nothing()
-                else:
-                    # player.move_to_attack()
-                    self.do_nothing()
+        holder = self.ball.player_in_possession
+        attacking_team = [x for x in teams if holder in x.players][0]
+        defending_team = [x for x in teams if x is not attacking_team][0]
+        all_players = [y for x in teams for y in x.players]
+        basket = self.court.get_basket_position(basket=attacking_team.attack_basket)
+        self.mark_attackers(attacking_team=attacking_team, defending_team=defending_team, all_players=all_players, basket=basket)
+        self.space_attackers(attacking_team=attacking_team, all_players=all_players, holder=holder)
+        if self.rng.random() >= self.DECISION_CHANCE:
+            self.advance(player=holder, all_players=all_players, basket=basket)
+            return
+        decision = self.decisions.decide(attackers=attacking_team.players, attack_ratings=attacking_team.ratings, defenders=defending_team.players, defense_ratings=defending_team.ratings, holder=attacking_team.players.index(holder), basket=attacking_team.attack_basket, rng=self.rng)
+        if decision.action == self.decisions.ADVANCE:
+            self.advance(player=holder, all_players=all_players, basket=basket)
+        elif decision.action == self.decisions.SHOT:
+            # made or missed the ball ends up at the rim and is loose until someone collects it
+            rim_x, rim_y = basket.x - (self.ball.scaled_dimension.width // 2), basket.y - (self.ball.scaled_dimension.height // 2)
+            if self.projectiles is None:
+                self.score_shot(team=attacking_team, play=decision.target, made=decision.success, x=rim_x, y=rim_y)
+            else:
+                self.launch(kind=self.SHOT_FLIGHT, x=rim_x, y=rim_y, speed=self.SHOT_SPEED, owner=teams.index(attacking_team), payload=decision.target, success=decision.success)
+        elif decision.action == self.decisions.STEAL:
+            self.give_ball(player=defending_team.players[decision.target], team=defending_team)
+        else:
+            receiving_team = attacking_team if decision.success else defending_team
+            receiver = receiving_team.players[decision.target]
+            if self.projectiles is None:
+                self.give_ball(player=receiver, team=receiving_team)
+            else:
+                self.launch(kind=self.PASS_FLIGHT, x=receiver.position.x, y=receiver.position.y, speed=self.PASS_SPEED, owner=teams.index(receiving_team), payload=decision.target)
         return
-    def do_nothing(self):
+    def launch(self, kind:int, x:int, y:int, speed:float, owner:int, payload:int, success:bool=False):
+        self.ball.flight_slot = self.projectiles.spawn(x=self.ball.position.x, y=self.ball.position.y, target_x=x, target_y=y, speed=speed, kind=kind, owner=owner, payload=payload, success=success)
+        self.ball.unset_possession()
+        return
+    def fly(self, teams:List["InGameTeam"]):
+        # every projectile moves in one step, the ball follows its slot and its landing settles the play it started
+        landed, escaped = self.projectiles.step()
+        slot = self.ball.flight_slot
+        if slot is None:
+            return
+        self.ball.position.set(*self.projectiles.get_position(slot=slot))
+        if slot in escaped:
+            self.ball.flight_slot = None
+        elif slot in landed:
+            self.ball.flight_slot = None
+            team = teams[self.projectiles.owner[slot]]
+            if self.projectiles.kind[slot] == self.SHOT_FLIGHT:
+                self.score_shot(team=team, play=int(self.projectiles.payload[slot]), made=bool(self.projectiles.success[slot]), x=self.ball.position.x, y=self.ball.position.y)
+            else:
+                self.give_ball(player=team.players[self.projectiles.payload[slot]], team=team)
+        return
+    def score_shot(self, team:"InGameTeam", play:int, made:bool, x:int, y:int):
+        team.record_shot(play=play, made=made)
+        self.ball.position.set(x=x, y=y)
+        self.ball.unset_possession()
+        return
+    def advance(self, player:InGamePlayer, all_players:List[InGamePlayer], basket:Position):
+        self.move_player_towards(player=player, all_players=all_players, x=basket.x - (player.scaled_dimension.width // 2), y=basket.y - (player.scaled_dimension.height // 2))
+        return
+    def space_attackers(self, attacking_team:"InGameTeam", all_players:List[InGamePlayer], holder:InGamePlayer):
+        # off-ball attackers each run to their own spot around the arc to open passing lanes
+        for index, attacker in enumerate(attacking_team.players):
+            if attacker is holder:
+                continue
+            spot = self.court.get_spacing_spot(basket=attacking_team.attack_basket, index=index)
+            self.move_player_towards(player=attacker, all_players=all_players, x=spot.x - (attacker.scaled_dimension.width // 2), y=spot.y - (attacker.scaled_dimension.height // 2))
+        return
+    def mark_attackers(self, attacking_team:"InGameTeam", defending_team:"InGameTeam", all_players:List[InGamePlayer], basket:Position):
+        # every defender takes the attacker with the same index and stands a body length off them towards the basket
+        for index, defender in enumerate(defending_team.players):
+            attacker = attacking_team.players[index % len(attacking_team.players)]
+            distance_x, distance_y = basket.x - attacker.position.x, basket.y - attacker.position.y
+            distance = max(math.hypot(distance_x, distance_y), 1)
+            x = attacker.position.x + int(distance_x * defender.scaled_dimension.height / distance)
+            y = attacker.position.y + int(distance_y * defender.scaled_dimension.height / distance)
+            self.move_player_towards(player=defender, all_players=all_players, x=x, y=y)
+        return
+    def give_ball(self, player:InGamePlayer, team:"InGameTeam"):
+        self.ball.position.set(x=player.position.x, y=player.position.y)
+        self.ball.set_possession(player=player, team=team)
         return
-
-
@@ -0,0 +1,127 @@
+import queue
+import threading
+import pygame
+from enum import Enum
+from pygame import Surface
+from game.basketball_trial import BasketBallTrialGame
+from typing import List, Tuple, NamedTuple, Optional
+
+FRAME_POOL_SIZE = 8
+# how often a blocked submit looks up from the pool to check the writer is still alive
+WRITER_POLL_SECONDS = 0.1
+# byte order of a 32 bit pixel for each channel mask layout, in the names ffmpeg takes as -pix_fmt
+RAW_PIXEL_FORMATS = {
+    (0xff0000, 0xff00, 0xff, 0): "bgr0",
+    (0xff0000, 0xff00, 0xff, 0xff000000): "bgra",
+    (0xff, 0xff00, 0xff0000, 0): "rgb0",
+    (0xff, 0xff00, 0xff0000, 0xff000000): "rgba",
+}
+
+class FrameExportStats(NamedTuple):
+    submitted:int
+    written:int
+    dropped:int
+class FrameExportPolicy(Enum):
+    # what submit does when every pool surface is still waiting on the writer
+    DROP = "drop"
+    BLOCK = "block"
+class FrameExporter:
+    # frames are copied once into a fixed pool of surfaces on the game loop, a writer thread hands their pixel buffers to disk
+    # memory never grows past the pool, a slow writer either costs frames or holds the game loop back, as the policy says
+    def __init__(self, output_path:str, size:Tuple[int, int], image_sequence:bool=False, pool_size:int=FRAME_POOL_SIZE, policy:FrameExportPolicy=FrameExportPolicy.DROP):
+        if pool_size < 1:
+            raise ValueError(f"frame pool needs at least one surface, got {pool_size}")
+        if image_sequence and "{frame" not in output_path:
+            raise ValueError(f"image sequence path {output_path} has no {{frame}} field")
+        self.output_path = output_path
+        self.size = tuple(size)
+        self.image_sequence = image_sequence
+        self.policy = policy
+        self.surfaces:List[Surface] = [Surface(self.size, 0, 32) for _ in range(pool_size)]
+        self.pixel_format = RAW_PIXEL_FORMATS.get(self.surfaces[0].get_masks())
+        if not image_sequence and self.pixel_format is None:
+            raise ValueError(f"no raw pixel format for surface masks {self.surfaces[0].get_masks()}")
+        self.free_surfaces:queue.Queue = queue.Queue()
+        [self.free_surfaces.put(index) for index in range(pool_size)]
+        # one place over the pool for the stop marker, so close never waits on a full queue
+        self.frames:queue.Queue = queue.Queue(maxsize=pool_size + 1)
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.error:Optional[BaseException] = None
+        self.file = None if image_sequence else open(self.output_path, "wb")
+        self.writer = threading.Thread(target=self.write_frames, name="frame-exporter", daemon=True)
+        self.writer.start()
+    def submit(self, surface:Surface) -> bool:
+        # returns whether the frame made it into the pool, dropped frames are counted and leave no gap in the output
+        self.check_writer()
+        index = None
+        while index is None:
+            try:
+                index = self.free_surfaces.get(block=self.policy is FrameExportPolicy.BLOCK, timeout=WRITER_POLL_SECONDS)
+            except queue.Empty:
+                if self.policy is FrameExportPolicy.DROP:
+                    self.dropped += 1
+                    return False
+                self.check_writer()
+        frame = self.surfaces[index]
+        if surface.get_size() == self.size:
+            frame.blit(surface, (0, 0))
+        else:
+            pygame.transform.scale(surface, self.size, frame)
+        self.frames.put((self.submitted, index))
+        self.submitted += 1
+        return True
+    def write_frame(self, number:int, frame:Surface):
+        if self.image_sequence:
+            pygame.image.save(frame, self.output_path.format(frame=number))
+            return
+        # the surface's own pixel memory goes straight to the file, the view keeps it locked until it is dropped
+        view = frame.get_view("0")
+        self.file.write(view)
+        del view
+        return
+    def write_frames(self):
+        # a failed write stops the writer, the game loop finds the error on its next submit or close
+        try:
+            while True:
+                item = self.frames.get()
+                if item is None: break
+                number, index = item
+                self.write_frame(number=number, frame=self.surfaces[index])
+                self.written += 1
+                self.free_surfaces.put(index)
+        except BaseException as error:
+            self.error = error
+        finally:
+            if self.file is not None:
+                self.file.close()
+        return
+    def check_writer(self):
+        if self.error is not None:
+            raise self.error
+        if not self.writer.is_alive():
+            raise ValueError("frame writer has stopped, the exporter is closed")
+        return
+    def close(self):
+        if self.writer.is_alive():
+            self.frames.put(None)
+            self.writer.join()
+        if self.error is not None:
+            raise self.error
+        return
+    def get_stats(self) -> FrameExportStats:
+        return FrameExportStats(submitted=self.submitted, written=self.written, dropped=self.dropped)
+def export_match(basketball_trial:BasketBallTrialGame, exporter:FrameExporter, ticks:int, frame_interval:int=1) -> FrameExportStats:
+    # plays a headless match and hands every frame_interval-th tick to the exporter, the raw stream plays back with
+    # ffmpeg -f rawvideo -pix_fmt <exporter.pixel_format> -s <width>x<height> -r <tick rate / frame_interval> -i <output_path>
+    basketball_trial.begin_match()
+    try:
+        for tick in range(ticks):
+            basketball_trial.simulation_tick()
+            if tick % frame_interval == 0:
+                basketball_trial.draw_frame()
+                exporter.submit(surface=basketball_trial.get_window())
+    finally:
+        exporter.close()
+    return exporter.get_stats()
@@ -0,0 +1,82 @@
+import array
+import collections
+from game.court import Court
+from typing import List, Tuple, Iterable
+
+NAVIGATION_CACHE_SIZE = 64
+UNREACHABLE = 1 << 30
+
+class NavigationGrid:
+    # coarse occupancy grid over the court with cached breadth first distance fields towards target cells
+    # a field is only rebuilt once a player has crossed into another cell since it was last built
+    def __init__(self, court:Court, cell_size:int, cache_size:int=NAVIGATION_CACHE_SIZE):
+        areas = [court.get_home_area(), court.get_away_area()]
+        self.left = min([x.position.x for x in areas])
+        self.top = min([x.position.y for x in areas])
+        self.right = max([x.position.x + x.dimension.width for x in areas])
+        self.bottom = max([x.position.y + x.dimension.height for x in areas])
+        self.cell_size = max(1, cell_size)
+        self.columns = max(1, -(-(self.right - self.left) // self.cell_size))
+        self.rows = max(1, -(-(self.bottom - self.top) // self.cell_size))
+        self.cache_size = cache_size
+        self.occupancy = bytearray(self.columns * self.rows)
+        self.version = 0
+        self.fields:"collections.OrderedDict[int, Tuple[int, array.array]]" = collections.OrderedDict()
+        self.neighbours = [self.cell_neighbours(cell=x) for x in range(self.columns * self.rows)]
+    def cell_neighbours(self, cell:int) -> Tuple[int, ...]:
+        row, column = divmod(cell, self.columns)
+        return tuple([((row + y) * self.columns) + column + x for y in (-1, 0, 1) for x in (-1, 0, 1) if (x or y) and 0 <= row + y < self.rows and 0 <= column + x < self.columns])
+    def cell(self, x:int, y:int) -> int:
+        column = min(max((x - self.left) // self.cell_size, 0), self.columns - 1)
+        row = min(max((y - self.top) // self.cell_size, 0), self.rows - 1)
+        return (row * self.columns) + column
+    def cell_center(self, cell:int) -> Tuple[int, int]:
+        row, column = divmod(cell, self.columns)
+        return self.left + (column * self.cell_size) + (self.cell_size // 2), self.top + (row * self.cell_size) + (self.cell_size // 2)
+    def refresh(self, players:Iterable):
+        # players block the cell their center is in, an unchanged layout keeps every cached field valid
+        occupancy = bytearray(self.columns * self.rows)
+        for player in players:
+            occupancy[self.cell(x=player.position.x + (player.scaled_dimension.width // 2), y=player.position.y + (player.scaled_dimension.height // 2))] = 1
+        if occupancy != self.occupancy:
+            self.occupancy = occupancy
+            self.version += 1
+        return
+    def distance_field(self, target:int) -> array.array:
+        cached = self.fields.get(target)
+        if cached is not None and cached[0] == self.version:
+            self.fields.move_to_end(target)
+            return cached[1]
+        distances = array.array('i', [UNREACHABLE]) * (self.columns * self.rows)
+        distances[target] = 0
+        occupancy, neighbours = self.occupancy, self.neighbours
+        queue = collections.deque([target])
+        while queue:
+            cell = queue.popleft()
+            distance = distances[cell] + 1
+            for neighbour in neighbours[cell]:
+                if distances[neighbour] == UNREACHABLE and not occupancy[neighbour]:
+                    distances[neighbour] = distance
+                    queue.append(neighbour)
+        self.fields[target] = (self.version, distances)
+        self.fields.move_to_end(target)
+        if len(self.fields) > self.cache_size:
+            self.fields.popitem(last=False)
+        return distances
+    def next_waypoint(self, player, x:int, y:int) -> Tuple[int, int]:
+        # where the player should head this tick to reach (x, y) around the others, both in top left sprite coordinates
+        half_width, half_height = player.scaled_dimension.width // 2, player.scaled_dimension.height // 2
+        cell = self.cell(x=player.position.x + half_width, y=player.position.y + half_height)
+        target = self.cell(x=x + half_width, y=y + half_height)
+        if cell == target:
+            return x, y
+        distances = self.distance_field(target=target)
+        best = min(self.neighbours[cell], key=distances.__getitem__)
+        # next to the target, or walled in, the last stretch is a straight line
+        if best == target or distances[best] == UNREACHABLE:
+            return x, y
+        center_x, center_y = self.cell_center(cell=best)
+        return center_x - half_width, center_y - half_height
+    def clear(self):
+        self.fields.clear()
+        return
@@ -0,0 +1,53 @@
+import pygame
+from game.assets import assets_overlap
+from game.entities import Ball, InGamePlayer, InGameTeam
+from game.spatial import SpatialHash
+from typing import List, Dict, NamedTuple, Callable, Optional
+
+class PossessionChange(NamedTuple):
+    previous_player:Optional[InGamePlayer]
+    previous_team:Optional[InGameTeam]
+    player:Optional[InGamePlayer]
+    team:Optional[InGameTeam]
+class PossessionResolver:
+    # the ball is only tested against the players sharing its spatial hash cells, the current holder first
+    def __init__(self, ball:Ball, spatial_hash:SpatialHash, player_teams:Dict[InGamePlayer, InGameTeam], player_indexes:Dict[InGamePlayer, int], pixel_collision:bool=False):
+        self.ball = ball
+        self.spatial_hash = spatial_hash
+        self.player_teams = player_teams
+        self.player_indexes = player_indexes
+        self.pixel_collision = pixel_collision
+        self.holder:Optional[InGamePlayer] = None
+        self.listeners:List[Callable[[PossessionChange], None]] = []
+    def subscribe(self, listener:Callable[[PossessionChange], None]):
+        self.listeners.append(listener)
+        return
+    def is_touching(self, player:InGamePlayer, ball_rect:pygame.Rect) -> bool:
+        player_rect = player.get_rect()
+        if not player_rect.colliderect(ball_rect):
+            return False
+        return not self.pixel_collision or assets_overlap(asset=player.asset, rect=player_rect, other_asset=self.ball.asset, other_rect=ball_rect)
+    def find_holder(self) -> Optional[InGamePlayer]:
+        ball_rect = self.ball.get_rect()
+        # whoever has the ball keeps it as long as they still touch it
+        previous = self.ball.player_in_possession
+        if previous is not None and self.is_touching(player=previous, ball_rect=ball_rect):
+            return previous
+        # bucket order follows object hashes, the lowest player index wins so seeded matches replay exactly
+        holder = None
+        for player in self.spatial_hash.query(rect=ball_rect):
+            if (holder is None or self.player_indexes[player] < self.player_indexes[holder]) and self.is_touching(player=player, ball_rect=ball_rect):
+                holder = player
+        return holder
+    def resolve(self) -> Optional[InGamePlayer]:
+        holder = self.find_holder()
+        if holder is None:
+            self.ball.unset_possession()
+        else:
+            self.ball.set_possession(player=holder, team=self.player_teams[holder])
+        self.ball.sync_ball_position_to_possession()
+        if holder is not self.holder:
+            change = PossessionChange(previous_player=self.holder, previous_team=self.player_teams.get(self.holder), player=holder, team=self.player_teams.get(holder))
+            self.holder = holder
+            [listener(change) for listener in self.listeners]
+        return holder
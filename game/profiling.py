@@ -0,0 +1,76 @@
+import array
+import time
+import pygame
+from pygame import Surface, Rect
+from game.utils import Color
+from typing import List, Dict, Tuple, NamedTuple, Callable, Optional
+
+class TimingSummary(NamedTuple):
+    name:str
+    count:int
+    mean_ms:float
+    p50_ms:float
+    p95_ms:float
+    p99_ms:float
+class TimingRing:
+    # fixed size ring of the last timings in nanoseconds, recording never allocates
+    def __init__(self, capacity:int):
+        self.capacity = capacity
+        self.timings = array.array('q', [0] * capacity)
+        self.count = 0
+    def add(self, elapsed_ns:int):
+        self.timings[self.count % self.capacity] = elapsed_ns
+        self.count += 1
+        return
+    def values(self) -> List[int]:
+        return list(self.timings[:min(self.count, self.capacity)])
+class TickProfiler:
+    # opt-in: the game only wraps its hot methods when a profiler is attached, so a disabled profiler costs nothing
+    def __init__(self, capacity:int=1024, font_size:int=18):
+        self.capacity = capacity
+        self.font_size = font_size
+        self.rings:Dict[str, TimingRing] = {}
+        self.font = None
+    def ring(self, name:str) -> TimingRing:
+        if name not in self.rings:
+            self.rings[name] = TimingRing(capacity=self.capacity)
+        return self.rings[name]
+    def wrap(self, name:str, function:Callable) -> Callable:
+        ring = self.ring(name=name)
+        clock = time.perf_counter_ns
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                ring.add(clock() - start)
+        return timed
+    @classmethod
+    def percentile(cls, values:List[int], percent:int) -> int:
+        # nearest rank on an already sorted list
+        return values[min(len(values) - 1, max(0, -(-len(values) * percent // 100) - 1))]
+    def summary(self, name:str) -> TimingSummary:
+        ring = self.rings[name]
+        values = sorted(ring.values())
+        if not values:
+            return TimingSummary(name=name, count=0, mean_ms=0.0, p50_ms=0.0, p95_ms=0.0, p99_ms=0.0)
+        to_ms = lambda val: val / 1_000_000
+        return TimingSummary(name=name, count=ring.count, mean_ms=to_ms(sum(values) / len(values)), p50_ms=to_ms(self.percentile(values=values, percent=50)), p95_ms=to_ms(self.percentile(values=values, percent=95)), p99_ms=to_ms(self.percentile(values=values, percent=99)))
+    def summaries(self) -> List[TimingSummary]:
+        return [self.summary(name=name) for name in self.rings]
+    def report_lines(self) -> List[str]:
+        return [f"{x.name:<16} n={x.count:<8} mean={x.mean_ms:7.3f}ms p50={x.p50_ms:7.3f}ms p95={x.p95_ms:7.3f}ms p99={x.p99_ms:7.3f}ms" for x in self.summaries()]
+    def report(self) -> str:
+        return "\n".join(self.report_lines())
+    def render_overlay(self) -> Surface:
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.SysFont("monospace", self.font_size)
+        lines = [self.font.render(line, True, Color.WHITE, Color.BLACK) for line in self.report_lines()] or [self.font.render("no timings yet", True, Color.WHITE, Color.BLACK)]
+        overlay = Surface((max([x.get_width() for x in lines]), sum([x.get_height() for x in lines])))
+        overlay.fill(Color.BLACK)
+        y = 0
+        for line in lines:
+            overlay.blit(line, (0, y))
+            y += line.get_height()
+        return overlay
@@ -0,0 +1,82 @@
+import math
+import numpy as np
+from pygame import Rect
+from typing import List, Tuple
+
+PROJECTILE_POOL_CAPACITY = 64
+
+class ProjectilePool:
+    # preallocated structure-of-arrays flights, a spawn takes a free slot and a landing hands it back, nothing is allocated per shot
+    def __init__(self, bounds:Rect, capacity:int=PROJECTILE_POOL_CAPACITY):
+        self.bounds = Rect(bounds)
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.velocity_x = np.zeros(capacity, dtype=np.float64)
+        self.velocity_y = np.zeros(capacity, dtype=np.float64)
+        self.target_x = np.zeros(capacity, dtype=np.float64)
+        self.target_y = np.zeros(capacity, dtype=np.float64)
+        self.remaining = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        # what the owner needs to resolve a landing, the pool itself never reads these
+        self.kind = np.zeros(capacity, dtype=np.int64)
+        self.owner = np.zeros(capacity, dtype=np.int64)
+        self.payload = np.zeros(capacity, dtype=np.int64)
+        self.success = np.zeros(capacity, dtype=bool)
+        # lowest slots are handed out first so a replay reuses the same slots in the same order
+        self.free_slots:List[int] = list(reversed(range(capacity)))
+    def spawn(self, x:int, y:int, target_x:int, target_y:int, speed:float, kind:int=0, owner:int=0, payload:int=0, success:bool=False) -> int:
+        if not self.free_slots:
+            raise ValueError(f"all {self.capacity} projectile slots are in flight")
+        slot = self.free_slots.pop()
+        ticks = max(1, math.ceil(math.hypot(target_x - x, target_y - y) / speed))
+        self.x[slot], self.y[slot] = x, y
+        self.target_x[slot], self.target_y[slot] = target_x, target_y
+        self.velocity_x[slot], self.velocity_y[slot] = (target_x - x) / ticks, (target_y - y) / ticks
+        self.remaining[slot] = ticks
+        self.active[slot] = True
+        self.kind[slot], self.owner[slot], self.payload[slot], self.success[slot] = kind, owner, payload, success
+        return slot
+    def step(self) -> Tuple[np.ndarray, np.ndarray]:
+        # one tick for every slot at once, returns the slots that reached their target and those that left the bounds
+        # both are recycled straight away, their arrays stay readable until the next spawn
+        active = self.active
+        self.x += self.velocity_x
+        self.y += self.velocity_y
+        self.remaining -= active
+        arrived = active & (self.remaining <= 0)
+        # landings snap to the target so float steps never leave a ball a pixel short
+        np.copyto(self.x, self.target_x, where=arrived)
+        np.copyto(self.y, self.target_y, where=arrived)
+        bounds = self.bounds
+        outside = active & ~arrived & ((self.x < bounds.left) | (self.x >= bounds.right) | (self.y < bounds.top) | (self.y >= bounds.bottom))
+        landed, escaped = np.flatnonzero(arrived), np.flatnonzero(outside)
+        [self.release(slot=int(slot)) for slot in landed]
+        [self.release(slot=int(slot)) for slot in escaped]
+        return landed, escaped
+    def release(self, slot:int):
+        self.active[slot] = False
+        self.velocity_x[slot] = self.velocity_y[slot] = 0
+        self.remaining[slot] = 0
+        self.free_slots.append(slot)
+        return
+    def get_position(self, slot:int) -> Tuple[int, int]:
+        return int(round(self.x[slot])), int(round(self.y[slot]))
+    def get_target(self, slot:int) -> Tuple[int, int]:
+        return int(self.target_x[slot]), int(self.target_y[slot])
+    def active_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.active)
+    def clear(self):
+        [self.release(slot=int(slot)) for slot in self.active_slots()]
+        self.free_slots = list(reversed(range(self.capacity)))
+        return
+    def get_state(self) -> Tuple:
+        # copies of every column and the free list, for match snapshots
+        columns = (self.x, self.y, self.velocity_x, self.velocity_y, self.target_x, self.target_y, self.remaining, self.active, self.kind, self.owner, self.payload, self.success)
+        return tuple([x.copy() for x in columns]), tuple(self.free_slots)
+    def set_state(self, state:Tuple):
+        columns, free_slots = state
+        for column, values in zip((self.x, self.y, self.velocity_x, self.velocity_y, self.target_x, self.target_y, self.remaining, self.active, self.kind, self.owner, self.payload, self.success), columns):
+            column[:] = values
+        self.free_slots = list(free_slots)
+        return
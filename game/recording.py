@@ -0,0 +1,97 @@
+import mmap
+import queue
+import struct
+import threading
+from typing import List, Tuple, NamedTuple, Optional
+
+RECORDING_MAGIC = b"BBTR"
+RECORDING_VERSION = 1
+# magic, version, player count, match seed
+RECORDING_HEADER = struct.Struct("<4sHHQ")
+
+def record_struct(player_count:int) -> struct.Struct:
+    # tick, ball x, ball y, player in possession (-1 when loose), team in possession (-1 when loose), then x, y of every player
+    return struct.Struct(f"<Iiihb{player_count * 2}i")
+class TickRecord(NamedTuple):
+    tick:int
+    ball_position:Tuple[int, int]
+    player_index:int
+    team_index:int
+    player_positions:List[Tuple[int, int]]
+class MatchRecorder:
+    # packs each tick into a fixed width record on the game loop and leaves all file io to a writer thread
+    def __init__(self, file_path:str, player_count:int, seed:int=0):
+        self.file_path = file_path
+        self.player_count = player_count
+        self.record_struct = record_struct(player_count=player_count)
+        self.records:queue.SimpleQueue = queue.SimpleQueue()
+        self.error:Optional[BaseException] = None
+        self.file = open(self.file_path, "wb")
+        self.file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, player_count, seed))
+        self.writer = threading.Thread(target=self.write_records, name="match-recorder", daemon=True)
+        self.writer.start()
+    def record(self, tick:int, ball_position:Tuple[int, int], player_index:int, team_index:int, player_positions:List[int]):
+        # player_positions is flat: x0, y0, x1, y1, ...
+        self.check_writer()
+        self.records.put(self.record_struct.pack(tick, *ball_position, player_index, team_index, *player_positions))
+        return
+    def write_records(self):
+        # a failed write stops the writer, the game loop finds the error on its next record or close
+        try:
+            while True:
+                record = self.records.get()
+                if record is None: break
+                self.file.write(record)
+        except BaseException as error:
+            self.error = error
+        finally:
+            try:
+                self.file.close()
+            except OSError as error:
+                self.error = self.error if self.error is not None else error
+        return
+    def check_writer(self):
+        if self.error is not None:
+            raise self.error
+        if not self.writer.is_alive():
+            raise ValueError(f"recorder for {self.file_path} has stopped, nothing more can be recorded")
+        return
+    def close(self):
+        if self.writer.is_alive():
+            self.records.put(None)
+            self.writer.join()
+        if self.error is not None:
+            raise self.error
+        return
+class MatchRecording:
+    # memory-mapped reader, any tick is one slice and unpack away without reading the rest of the match
+    def __init__(self, file_path:str):
+        self.file_path = file_path
+        self.file = open(self.file_path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.player_count, self.seed = RECORDING_HEADER.unpack_from(self.buffer, 0)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{self.file_path} is not a version {RECORDING_VERSION} match recording")
+        self.record_struct = record_struct(player_count=self.player_count)
+        self.record_count = (len(self.buffer) - RECORDING_HEADER.size) // self.record_struct.size
+    def __len__(self) -> int:
+        return self.record_count
+    def __getitem__(self, index:int) -> TickRecord:
+        index = index + self.record_count if index < 0 else index
+        if not 0 <= index < self.record_count:
+            raise IndexError(f"record {index} out of range for {self.record_count} records")
+        values = self.record_struct.unpack_from(self.buffer, RECORDING_HEADER.size + (index * self.record_struct.size))
+        player_values = values[5:]
+        player_positions = list(zip(player_values[0::2], player_values[1::2]))
+        return TickRecord(tick=values[0], ball_position=(values[1], values[2]), player_index=values[3], team_index=values[4], player_positions=player_positions)
+    def __iter__(self):
+        return (self[index] for index in range(self.record_count))
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+        return
+    def __enter__(self) -> "MatchRecording":
+        return self
+    def __exit__(self, *args):
+        self.close()
+        return
@@ -0,0 +1,108 @@
+import os
+import random
+from game.basketball_trial import MatchResult, ShotMix, init_batch_worker, simulate_match
+from game.entities import Team
+from pydantic import BaseModel
+from typing import List, Dict, Tuple, Iterator
+
+SEASON_CHECKPOINT_EVERY = 256
+
+class TeamSeasonSummary(BaseModel):
+    matches:int=0
+    wins:int=0
+    losses:int=0
+    draws:int=0
+    points:int=0
+    opponent_points:int=0
+    possession_ticks:int=0
+    opponent_possession_ticks:int=0
+    attempts:ShotMix=ShotMix()
+    makes:ShotMix=ShotMix()
+    def win_rate(self) -> float:
+        return self.wins / self.matches if self.matches else 0.0
+    def possession_share(self) -> float:
+        total = self.possession_ticks + self.opponent_possession_ticks
+        return self.possession_ticks / total if total else 0.0
+    def shot_mix(self) -> Dict[str, float]:
+        attempts = self.attempts.model_dump()
+        total = sum(attempts.values())
+        return {x: (count / total if total else 0.0) for x, count in attempts.items()}
+class SeasonSummary(BaseModel):
+    # running totals only, a season of any length stays the same size in memory and in its checkpoint
+    seed:int
+    repetitions:int
+    ticks:int
+    team_names:List[str]
+    completed_matches:int=0
+    teams:Dict[str, TeamSeasonSummary]={}
+    def add(self, match:MatchResult):
+        for team_name, points, opponent_points, possession_ticks, opponent_possession_ticks, attempts, makes in [(match.home_team, match.home_points, match.away_points, match.home_possession_ticks, match.away_possession_ticks, match.home_attempts, match.home_makes), (match.away_team, match.away_points, match.home_points, match.away_possession_ticks, match.home_possession_ticks, match.away_attempts, match.away_makes)]:
+            summary = self.teams.setdefault(team_name, TeamSeasonSummary())
+            summary.matches += 1
+            summary.wins += 1 if points > opponent_points else 0
+            summary.losses += 1 if points < opponent_points else 0
+            summary.draws += 1 if points == opponent_points else 0
+            summary.points += points
+            summary.opponent_points += opponent_points
+            summary.possession_ticks += possession_ticks
+            summary.opponent_possession_ticks += opponent_possession_ticks
+            for play in ShotMix.model_fields:
+                setattr(summary.attempts, play, getattr(summary.attempts, play) + getattr(attempts, play))
+                setattr(summary.makes, play, getattr(summary.makes, play) + getattr(makes, play))
+        self.completed_matches += 1
+        return
+def schedule_fixtures(teams:List[Team]) -> List[Tuple[Team, Team]]:
+    # every team hosts every other team once, season totals are kept by team name so names have to be unique
+    duplicate_names = sorted({x.name for x in teams if [y.name for y in teams].count(x.name) > 1})
+    if duplicate_names:
+        raise ValueError(f"season teams need unique names, {', '.join(duplicate_names)} used more than once")
+    return [(home_team, away_team) for home_team in teams for away_team in teams if home_team is not away_team]
+def season_match_seed(seed:int, match_index:int) -> int:
+    # derived from the index alone so a resumed season replays exactly the matches it would have played
+    return random.Random(f"{seed}:{match_index}").randrange(2 ** 32)
+def season_matches(fixtures:List[Tuple[Team, Team]], summary:SeasonSummary) -> Iterator[Tuple[int, Team, Team, int]]:
+    for match_index in range(summary.completed_matches, len(fixtures) * summary.repetitions):
+        home_team, away_team = fixtures[match_index // summary.repetitions]
+        yield match_index, home_team, away_team, season_match_seed(seed=summary.seed, match_index=match_index)
+def load_season_checkpoint(checkpoint_file_path:str, summary:SeasonSummary) -> SeasonSummary:
+    if checkpoint_file_path is None or not os.path.exists(checkpoint_file_path):
+        return summary
+    with open(checkpoint_file_path) as checkpoint_file:
+        checkpoint = SeasonSummary.model_validate_json(checkpoint_file.read())
+    if (checkpoint.seed, checkpoint.repetitions, checkpoint.ticks, checkpoint.team_names) != (summary.seed, summary.repetitions, summary.ticks, summary.team_names):
+        raise ValueError(f"checkpoint {checkpoint_file_path} belongs to a different season")
+    return checkpoint
+def save_season_checkpoint(checkpoint_file_path:str, summary:SeasonSummary):
+    # written aside and renamed over the old one, an interrupted write never leaves a broken checkpoint behind
+    temporary_file_path = f"{checkpoint_file_path}.tmp"
+    with open(temporary_file_path, "w") as checkpoint_file:
+        checkpoint_file.write(summary.model_dump_json())
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temporary_file_path, checkpoint_file_path)
+    return
+def run_season(teams:List[Team], repetitions:int, ticks:int, seed:int=0, checkpoint_file_path:str=None, checkpoint_every:int=SEASON_CHECKPOINT_EVERY, max_workers:int=None) -> SeasonSummary:
+    fixtures = schedule_fixtures(teams=teams)
+    summary = SeasonSummary(seed=seed, repetitions=repetitions, ticks=ticks, team_names=[x.name for x in teams])
+    summary = load_season_checkpoint(checkpoint_file_path=checkpoint_file_path, summary=summary)
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    image_file_paths = sorted({player.image_file_path for team in teams for player in team.players})
+    # multiprocessing is only paid for by seasons that ask for more than one worker
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(image_file_paths,)) if workers > 1 else None
+    try:
+        matches = season_matches(fixtures=fixtures, summary=summary)
+        while True:
+            # only one chunk of results is alive at a time, it is folded into the totals and checkpointed before the next starts
+            chunk = [x for _, x in zip(range(checkpoint_every), matches)]
+            if not chunk:
+                break
+            arguments = [[x[1] for x in chunk], [x[2] for x in chunk], [ticks] * len(chunk), [x[3] for x in chunk]]
+            results = executor.map(simulate_match, *arguments, chunksize=max(1, len(chunk) // (workers * 4))) if executor is not None else map(simulate_match, *arguments)
+            [summary.add(match=match) for match in results]
+            if checkpoint_file_path is not None:
+                save_season_checkpoint(checkpoint_file_path=checkpoint_file_path, summary=summary)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return summary
@@ -0,0 +1,21 @@
+import array
+from typing import Tuple, Any
+
+class MatchSnapshot:
+    # Surface-free match state; never mutated after capture, so any number of rollouts can restore from the same one
+    __slots__ = ('ball_position', 'player_index', 'x', 'y', 'stamina', 'rng_state', 'team_stats', 'flight')
+    def __init__(self, ball_position:Tuple[int, int], player_index:int, x:Any, y:Any, stamina:Any, rng_state:tuple, team_stats:tuple=(), flight:tuple=(None, None)):
+        self.ball_position = ball_position
+        self.player_index = player_index
+        # array('q') columns, or numpy copies when the game runs on the array backend
+        self.x = x
+        self.y = y
+        self.stamina = stamina
+        self.rng_state = rng_state
+        # (points, attempts, makes) per team
+        self.team_stats = team_stats
+        # the ball's projectile slot and the projectile pool columns
+        self.flight = flight
+    @classmethod
+    def columns(cls, values) -> array.array:
+        return array.array('q', values)
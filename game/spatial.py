@@ -0,0 +1,57 @@
+import pygame
+from pygame import Rect
+from game.court import Court
+from typing import List, Dict, Tuple, Set, Optional, Iterable
+
+class SpatialHash:
+    # uniform grid laid over the court, cell_size should be at least the largest sprite side so a sprite spans at most 2x2 cells
+    def __init__(self, court:Court, cell_size:int):
+        self.court = court
+        self.cell_size = max(1, cell_size)
+        self.columns = max(1, -(-court.dimension.width // self.cell_size))
+        self.rows = max(1, -(-court.dimension.height // self.cell_size))
+        self.cells:List[Set[pygame.sprite.Sprite]] = [set() for _ in range(self.columns * self.rows)]
+        self.sprite_cells:Dict[pygame.sprite.Sprite, Tuple[int, int, int, int]] = {}
+    def cell_column(self, x:int) -> int:
+        return min(max((x - self.court.position.x) // self.cell_size, 0), self.columns - 1)
+    def cell_row(self, y:int) -> int:
+        return min(max((y - self.court.position.y) // self.cell_size, 0), self.rows - 1)
+    def cell_range(self, rect:Rect) -> Tuple[int, int, int, int]:
+        return self.cell_column(rect.left), self.cell_row(rect.top), self.cell_column(rect.right - 1), self.cell_row(rect.bottom - 1)
+    def cell_indexes(self, cell_range:Tuple[int, int, int, int]) -> Iterable[int]:
+        left, top, right, bottom = cell_range
+        return [(row * self.columns) + column for row in range(top, bottom + 1) for column in range(left, right + 1)]
+    def insert(self, sprite:pygame.sprite.Sprite):
+        cell_range = self.cell_range(rect=sprite.get_rect())
+        for index in self.cell_indexes(cell_range=cell_range):
+            self.cells[index].add(sprite)
+        self.sprite_cells[sprite] = cell_range
+        return
+    def remove(self, sprite:pygame.sprite.Sprite):
+        cell_range = self.sprite_cells.pop(sprite, None)
+        if cell_range is None: return
+        for index in self.cell_indexes(cell_range=cell_range):
+            self.cells[index].discard(sprite)
+        return
+    def update(self, sprite:pygame.sprite.Sprite):
+        # only touches the buckets when the sprite actually crossed a cell boundary
+        cell_range = self.cell_range(rect=sprite.get_rect())
+        if self.sprite_cells.get(sprite) == cell_range: return
+        self.remove(sprite=sprite)
+        for index in self.cell_indexes(cell_range=cell_range):
+            self.cells[index].add(sprite)
+        self.sprite_cells[sprite] = cell_range
+        return
+    def update_all(self, sprites:Iterable[pygame.sprite.Sprite]):
+        [self.update(sprite=sprite) for sprite in sprites]
+        return
+    def clear(self):
+        [cell.clear() for cell in self.cells]
+        self.sprite_cells.clear()
+        return
+    def query(self, rect:Rect) -> Set[pygame.sprite.Sprite]:
+        # the single cell case hands back the live bucket, callers must not mutate it
+        indexes = self.cell_indexes(cell_range=self.cell_range(rect=rect))
+        if len(indexes) == 1:
+            return self.cells[indexes[0]]
+        return set().union(*[self.cells[index] for index in indexes])
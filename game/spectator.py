@@ -0,0 +1,212 @@
+import asyncio
+import struct
+import threading
+from game.recording import TickRecord, record_struct
+from typing import List, Tuple, Optional, Set
+
+SPECTATOR_MAGIC = b"BBTS"
+SPECTATOR_VERSION = 1
+# magic, version, player count, sent once when a spectator connects
+SPECTATOR_HEADER = struct.Struct("<4sHH")
+KEYFRAME, DELTA = 0, 1
+# frame kind, tick, ball x, ball y, player in possession, team in possession, changed player count
+DELTA_HEADER = struct.Struct("<BIiihbH")
+# player index, x, y for every player that moved since the previous frame
+DELTA_PLAYER = struct.Struct("<Hii")
+KEYFRAME_INTERVAL = 60
+# a spectator whose socket buffer passes the high mark stops getting frames until it drains below the low mark
+SPECTATOR_HIGH_WATER = 64 * 1024
+SPECTATOR_LOW_WATER = 16 * 1024
+
+def keyframe_struct(player_count:int) -> struct.Struct:
+    # frame kind followed by the same fixed width record the match recorder writes
+    return struct.Struct(f"<B{record_struct(player_count=player_count).format[1:]}")
+class SpectatorState:
+    __slots__ = ('tick', 'ball_position', 'player_index', 'team_index', 'player_positions')
+    def __init__(self, tick:int, ball_position:Tuple[int, int], player_index:int, team_index:int, player_positions:Tuple[int, ...]):
+        self.tick = tick
+        self.ball_position = ball_position
+        self.player_index = player_index
+        self.team_index = team_index
+        # flat: x0, y0, x1, y1, ...
+        self.player_positions = player_positions
+class SpectatorProtocol(asyncio.Protocol):
+    def __init__(self, server:"SpectatorServer"):
+        self.server = server
+        self.transport:Optional[asyncio.WriteTransport] = None
+        self.paused = False
+        self.needs_keyframe = True
+    def connection_made(self, transport:asyncio.WriteTransport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=self.server.high_water, low=self.server.low_water)
+        transport.write(SPECTATOR_HEADER.pack(SPECTATOR_MAGIC, SPECTATOR_VERSION, self.server.player_count))
+        self.server.subscribe(client=self)
+        return
+    def connection_lost(self, exc:Optional[Exception]):
+        self.server.unsubscribe(client=self)
+        return
+    def pause_writing(self):
+        self.paused = True
+        return
+    def resume_writing(self):
+        # whatever was skipped meanwhile is coalesced into one keyframe of the latest tick
+        self.paused = False
+        self.needs_keyframe = True
+        return
+    def data_received(self, data:bytes):
+        # the feed is one way, anything a spectator sends is ignored
+        return
+class SpectatorServer:
+    # live match feed for local spectators, the event loop runs in its own thread and the game loop only hands it the latest tick
+    # each tick is serialized at most once as a keyframe and once as a delta, and not at all while nobody is watching
+    def __init__(self, player_count:int, host:str="127.0.0.1", port:int=0, keyframe_interval:int=KEYFRAME_INTERVAL, high_water:int=SPECTATOR_HIGH_WATER, low_water:int=SPECTATOR_LOW_WATER):
+        self.player_count = player_count
+        self.host = host
+        self.port = port
+        self.keyframe_interval = keyframe_interval
+        self.high_water = high_water
+        self.low_water = low_water
+        self.keyframe_struct = keyframe_struct(player_count=player_count)
+        self.clients:Set[SpectatorProtocol] = set()
+        self.subscribers = 0
+        self.lock = threading.Lock()
+        self.pending:Optional[SpectatorState] = None
+        self.previous:Optional[SpectatorState] = None
+        self.last_keyframe_tick:Optional[int] = None
+        self.loop = asyncio.new_event_loop()
+        self.server:Optional[asyncio.AbstractServer] = None
+        self.error:Optional[BaseException] = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run_loop, name="spectator-server", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            self.thread.join()
+            raise self.error
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(self.loop.create_server(lambda: SpectatorProtocol(server=self), host=self.host, port=self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as error:
+            self.error = error
+            self.ready.set()
+            self.loop.close()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+        return
+    def subscribe(self, client:SpectatorProtocol):
+        self.clients.add(client)
+        self.subscribers = len(self.clients)
+        return
+    def unsubscribe(self, client:SpectatorProtocol):
+        self.clients.discard(client)
+        self.subscribers = len(self.clients)
+        return
+    def has_subscribers(self) -> bool:
+        return self.subscribers > 0
+    def publish(self, tick:int, ball_position:Tuple[int, int], player_index:int, team_index:int, player_positions:List[int]):
+        # called from the game thread, a tick the loop has not got to yet is replaced rather than queued behind
+        if not self.subscribers:
+            return
+        state = SpectatorState(tick=tick, ball_position=ball_position, player_index=player_index, team_index=team_index, player_positions=tuple(player_positions))
+        with self.lock:
+            scheduled = self.pending is not None
+            self.pending = state
+        if not scheduled:
+            self.loop.call_soon_threadsafe(self.broadcast)
+        return
+    def encode_keyframe(self, state:SpectatorState) -> bytes:
+        return self.keyframe_struct.pack(KEYFRAME, state.tick, *state.ball_position, state.player_index, state.team_index, *state.player_positions)
+    def encode_delta(self, previous:SpectatorState, state:SpectatorState) -> bytes:
+        positions, previous_positions = state.player_positions, previous.player_positions
+        moved = [x for x in range(self.player_count) if positions[x * 2] != previous_positions[x * 2] or positions[(x * 2) + 1] != previous_positions[(x * 2) + 1]]
+        header = DELTA_HEADER.pack(DELTA, state.tick, *state.ball_position, state.player_index, state.team_index, len(moved))
+        return header + b"".join([DELTA_PLAYER.pack(x, positions[x * 2], positions[(x * 2) + 1]) for x in moved])
+    def broadcast(self):
+        with self.lock:
+            state, self.pending = self.pending, None
+        if state is None or not self.clients:
+            return
+        # everyone who is keeping up holds self.previous, so one delta serves all of them
+        periodic = self.last_keyframe_tick is None or state.tick - self.last_keyframe_tick >= self.keyframe_interval
+        keyframe, delta = None, None
+        for client in self.clients:
+            if client.paused:
+                continue
+            if periodic or client.needs_keyframe or self.previous is None:
+                keyframe = keyframe if keyframe is not None else self.encode_keyframe(state=state)
+                client.transport.write(keyframe)
+                client.needs_keyframe = False
+            else:
+                delta = delta if delta is not None else self.encode_delta(previous=self.previous, state=state)
+                client.transport.write(delta)
+        if periodic:
+            self.last_keyframe_tick = state.tick
+        self.previous = state
+        return
+    def stop(self):
+        self.server.close()
+        [x.transport.close() for x in list(self.clients)]
+        self.loop.stop()
+        return
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.stop)
+        self.thread.join()
+        return
+class SpectatorDecoder:
+    # client side of the feed: turns the byte stream back into full tick records, deltas apply onto the last frame
+    def __init__(self):
+        self.buffer = bytearray()
+        self.player_count:Optional[int] = None
+        self.keyframe_struct:Optional[struct.Struct] = None
+        self.positions:Optional[List[int]] = None
+    def feed(self, data:bytes) -> List[TickRecord]:
+        self.buffer += data
+        records = []
+        offset = 0
+        if self.player_count is None:
+            if len(self.buffer) < SPECTATOR_HEADER.size:
+                return records
+            magic, version, self.player_count = SPECTATOR_HEADER.unpack_from(self.buffer, 0)
+            if magic != SPECTATOR_MAGIC or version != SPECTATOR_VERSION:
+                raise ValueError(f"not a version {SPECTATOR_VERSION} spectator feed")
+            self.keyframe_struct = keyframe_struct(player_count=self.player_count)
+            offset = SPECTATOR_HEADER.size
+        while offset < len(self.buffer):
+            record, size = self.read_frame(offset=offset)
+            if record is None:
+                break
+            records.append(record)
+            offset += size
+        del self.buffer[:offset]
+        return records
+    def read_frame(self, offset:int) -> Tuple[Optional[TickRecord], int]:
+        kind = self.buffer[offset]
+        if kind == KEYFRAME:
+            if len(self.buffer) - offset < self.keyframe_struct.size:
+                return None, 0
+            values = self.keyframe_struct.unpack_from(self.buffer, offset)
+            tick, ball_x, ball_y, player_index, team_index = values[1:6]
+            self.positions = list(values[6:])
+            size = self.keyframe_struct.size
+        elif kind == DELTA:
+            if len(self.buffer) - offset < DELTA_HEADER.size:
+                return None, 0
+            _, tick, ball_x, ball_y, player_index, team_index, moved = DELTA_HEADER.unpack_from(self.buffer, offset)
+            size = DELTA_HEADER.size + (moved * DELTA_PLAYER.size)
+            if len(self.buffer) - offset < size:
+                return None, 0
+            if self.positions is None:
+                raise ValueError("spectator feed sent a delta before its first keyframe")
+            for index, x, y in DELTA_PLAYER.iter_unpack(self.buffer[offset + DELTA_HEADER.size:offset + size]):
+                self.positions[index * 2], self.positions[(index * 2) + 1] = x, y
+        else:
+            raise ValueError(f"unknown spectator frame kind {kind}")
+        player_positions = list(zip(self.positions[0::2], self.positions[1::2]))
+        return TickRecord(tick=tick, ball_position=(ball_x, ball_y), player_index=player_index, team_index=team_index, player_positions=player_positions), size
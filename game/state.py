@@ -0,0 +1,76 @@
+import numpy as np
+from game.court import Court
+from game.entities import Ball, InGamePlayer, InGameTeam, LooseBall
+from game.spatial import SpatialHash
+from game.utils import Position
+from typing import List, Tuple
+
+class StorePosition(Position):
+    # Position view onto one row of a PlayerStateStore, reads and writes go straight to the arrays
+    __slots__ = ('store', 'index')
+    def __init__(self, store:"PlayerStateStore", index:int):
+        self.store = store
+        self.index = index
+    @property
+    def x(self) -> int:
+        return int(self.store.x[self.index])
+    @x.setter
+    def x(self, x:int):
+        self.store.x[self.index] = x
+    @property
+    def y(self) -> int:
+        return int(self.store.y[self.index])
+    @y.setter
+    def y(self, y:int):
+        self.store.y[self.index] = y
+class PlayerStateStore:
+    # structure-of-arrays state for every player of every team, teams occupy contiguous rows in team order
+    def __init__(self, teams:List[InGameTeam]):
+        self.players:List[InGamePlayer] = [y for x in teams for y in x.players]
+        self.team_slices:List[slice] = []
+        start = 0
+        for team in teams:
+            self.team_slices.append(slice(start, start + len(team.players)))
+            start += len(team.players)
+        self.team = np.array([index for index, team in enumerate(teams) for _ in team.players], dtype=np.int64)
+        self.x = np.zeros(len(self.players), dtype=np.int64)
+        self.y = np.zeros(len(self.players), dtype=np.int64)
+        self.speed = np.array([x.player.speed for x in self.players], dtype=np.int64)
+        self.stamina = np.array([x.stamina for x in self.players], dtype=np.int64)
+        self.width = np.array([x.scaled_dimension.width for x in self.players], dtype=np.int64)
+        self.height = np.array([x.scaled_dimension.height for x in self.players], dtype=np.int64)
+        [player.bind_position(position_view=StorePosition(store=self, index=index)) for index, player in enumerate(self.players)]
+    def get_team(self, team_index:int) -> Tuple[np.ndarray, np.ndarray]:
+        team_slice = self.team_slices[team_index]
+        return self.x[team_slice], self.y[team_slice]
+    def overlapping(self, x:np.ndarray, y:np.ndarray, other_x:np.ndarray, other_y:np.ndarray) -> np.ndarray:
+        # pairwise rect overlap of row i at (x, y) against row j at (other_x, other_y), the same rule as Rect.colliderect
+        overlap = (x[:, None] < other_x[None, :] + self.width[None, :]) & (other_x[None, :] < x[:, None] + self.width[:, None])
+        overlap &= (y[:, None] < other_y[None, :] + self.height[None, :]) & (other_y[None, :] < y[:, None] + self.height[:, None])
+        np.fill_diagonal(overlap, False)
+        return overlap.any(axis=1)
+    def colliding(self, x:np.ndarray, y:np.ndarray) -> np.ndarray:
+        # a candidate is blocked by where the others stand now and by where they are trying to go, so simultaneous moves never overlap
+        return self.overlapping(x=x, y=y, other_x=self.x, other_y=self.y) | self.overlapping(x=x, y=y, other_x=x, other_y=y)
+class ArrayLooseBall(LooseBall):
+    # LooseBall computed as one array step for all players, moves are resolved simultaneously rather than player by player
+    # collisions are rect against rect, pixel accurate collision is only available on the scalar strategies
+    def __init__(self, court:Court, ball:Ball, store:PlayerStateStore, spatial_hash:SpatialHash=None, navigation:"NavigationGrid"=None):
+        super().__init__(court=court, ball=ball, spatial_hash=spatial_hash, navigation=navigation)
+        self.store = store
+    def execute(self, teams:List[InGameTeam], x:int=None, y:int=None):
+        store = self.store
+        ball_x, ball_y = self.ball.position.get() if x is None else (x, y)
+        target_x, target_y = ball_x, ball_y
+        if self.navigation is not None:
+            # waypoints come from the shared grid one player at a time, the steps towards them are still taken together
+            waypoints = [self.navigation.next_waypoint(player=player, x=ball_x, y=ball_y) for player in store.players]
+            target_x = np.array([x for x, _ in waypoints], dtype=np.int64)
+            target_y = np.array([y for _, y in waypoints], dtype=np.int64)
+        x = store.x + (store.speed * np.sign(target_x - store.x))
+        np.copyto(store.x, x, where=~store.colliding(x=x, y=store.y))
+        y = store.y + (store.speed * np.sign(target_y - store.y))
+        np.copyto(store.y, y, where=~store.colliding(x=store.x, y=y))
+        if self.spatial_hash is not None:
+            self.spatial_hash.update_all(sprites=store.players)
+        return
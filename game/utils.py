@@ -1,5 +1,4 @@
 import pygame
-from PIL import Image
 from pydantic import BaseModel
 from pygame import Surface
 from typing import List, Dict, NamedTuple, Tuple, Optional
@@ -8,9 +7,16 @@ ARC_PI = 3.14
 def ratio(val:int, mul:int|float=1, div:int|float=1) -> int:
     return int((val * mul) / div)
 def image_dimensions(image_file_path):
+    from PIL import Image
     with Image.open(image_file_path) as image:
         image_width, image_height = image.size
     return image_width, image_height
+def convert(surface:Surface) -> Surface:
+    return surface if pygame.display.get_surface() is None else surface.convert()
+def interpolate(previous:Tuple[int, int], current:Tuple[int, int], interpolation:float) -> Tuple[int, int]:
+    if previous is None or interpolation >= 1:
+        return current
+    return previous[0] + round((current[0] - previous[0]) * interpolation), previous[1] + round((current[1] - previous[1]) * interpolation)
 def find_trend(val) -> int:
     return 0 if val == 0 else int(val / abs(val))
 class Color:
@@ -24,6 +30,7 @@ class Color:
     VERY_LIGHT_ORANGE = (241, 208, 159)
     SEMI_RED = (227, 112, 112)
 class Dimension:
+    __slots__ = ('width', 'height')
     def __init__(self, width:int, height:int):
         self.width = width
         self.height = height
@@ -40,6 +47,7 @@ class Dimension:
     def copy(cls, dimension:"Dimension"):
         return cls.new(pair=dimension.get())
 class Position:
+    __slots__ = ('x', 'y')
     def __init__(self, x:int, y:int):
         self.x = x
         self.y = y
@@ -48,6 +56,10 @@ class Position:
         return Position(x=pair[0], y=pair[1])
     def get(self) -> Tuple[int, int]:
         return self.x, self.y
+    def set(self, x:int, y:int):
+        self.x = x
+        self.y = y
+        return
     def ratio_x(self, mul:int|float=1, div:int|float=1) -> int:
         return ratio(val=self.x, mul=mul, div=div)
     def ratio_y(self, mul:int|float=1, div:int|float=1) -> int: